@@ -0,0 +1,262 @@
+"""Headless batch run of every ratio, Piotroski and valuation calculation for a list of tickers.
+
+Fetches on an event loop behind the shared rate limiter, computes on a process pool
+and appends each ticker's rows to the output files as soon as it finishes. No Streamlit needed:
+    python batch.py MSFT AAPL NVDA --out results/
+    python batch.py --file universe.txt --out results/ --format parquet --fetch-workers 16
+Tickers that fail are reported and skipped; the rest of the batch carries on.
+"""
+import argparse
+import asyncio
+import os
+import queue
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import pandas as pd
+
+from cache import DiskCache, get_default_cache
+from fetch import AsyncFetcher
+from providers import MemoryProvider, provider_from_env
+from sessions import shared_session_stats
+from stock import stock
+
+FETCH_WORKERS = 8
+
+# Output tables, one file each
+TABLES = ["quarterly_ratios", "yearly_ratios", "ttm_ratios", "quarterly_multiples", "yearly_multiples", "piotroski", "valuation"]
+
+
+async def fetch_universe(fetcher, tickers, cache, on_fetched, in_flight):
+    # Only `in_flight` tickers hold rate limiter reservations at a time, so an open circuit is noticed quickly
+    slots = asyncio.Semaphore(in_flight)
+
+    async def fetch_one(ticker):
+        async with slots:
+            try:
+                results, failures, _ = await fetcher.fetch_ticker(ticker, cache=cache)
+            except Exception as e:
+                results, failures = None, {"all": e}
+        on_fetched(ticker, results, failures)
+
+    await asyncio.gather(*(fetch_one(ticker) for ticker in tickers))
+
+
+# Disk caches opened by this worker process, by path
+worker_caches = {}
+
+
+def worker_cache(path):
+    """This process's own connection to the disk cache at `path`"""
+    if path not in worker_caches:
+        worker_caches[path] = DiskCache(path)
+    return worker_caches[path]
+
+
+def compute_ticker(ticker, payloads, memo=None):
+    """Builds `stock` from already fetched payloads and returns its output tables plus its warnings.
+
+    With `memo`, the path of a disk cache, the derived frames are reused from it whenever the statements are unchanged."""
+    memo = worker_cache(memo) if memo is not None else False
+    stock_obj = stock(ticker, provider=MemoryProvider({ticker: payloads}), max_workers=1, memo=memo)
+    if not hasattr(stock_obj, "q_dates"):
+        raise RuntimeError(stock_obj.errors[0] if stock_obj.errors else f"No data for {ticker}")
+
+    stock_obj.calculate_quarterly_ratios()
+    stock_obj.calculate_yearly_ratios()
+    stock_obj.calculate_ttm_ratios()
+    stock_obj.one_time_ratios()
+    stock_obj.piotroski_f_score_yearly()
+
+    tables = {
+        "quarterly_ratios": stock_obj.qratios.rename_axis("Date").reset_index(),
+        "yearly_ratios": stock_obj.yratios.rename_axis("Date").reset_index(),
+        "ttm_ratios": stock_obj.tratios.rename_axis("Date").reset_index(),
+        "quarterly_multiples": stock_obj.qmultiples.rename_axis("Date").reset_index(),
+        "yearly_multiples": stock_obj.ymultiples.rename_axis("Date").reset_index(),
+        "piotroski": stock_obj.f_score_y.reset_index(),
+        "valuation": pd.DataFrame([stock_obj.one_time_metrics()]),
+    }
+    for df in tables.values():
+        df.insert(0, "Ticker", ticker)
+    return tables, stock_obj.errors
+
+
+class CsvSink():
+    """Appends frames to a CSV file, keeping the columns of the first one"""
+
+    def __init__(self, path):
+        self.path = path
+        self.columns = None
+
+    def write(self, df):
+        header = self.columns is None
+        if header:
+            self.columns = list(df.columns)
+        df.reindex(columns=self.columns).to_csv(self.path, mode="w" if header else "a", header=header, index=False)
+
+    def close(self):
+        pass
+
+
+class ParquetSink():
+    """Appends frames to a Parquet file as row groups, keeping the schema of the first one"""
+
+    def __init__(self, path):
+        self.path = path
+        self.writer = None
+
+    def write(self, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.writer is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            self.writer = pq.ParquetWriter(self.path, table.schema)
+        else:
+            df = df.reindex(columns=self.writer.schema.names)
+            table = pa.Table.from_pandas(df, schema=self.writer.schema, preserve_index=False)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+SINKS = {"csv": CsvSink, "parquet": ParquetSink}
+
+
+def iter_batch(tickers, fetch_workers=FETCH_WORKERS, compute_workers=None, provider=None, cache=True):
+    """Fetches on an event loop and computes on a process pool, yielding every ticker as it finishes.
+
+    Yields (ticker, tables, warnings, error): the tables and warnings of `compute_ticker`
+    when it succeeded, or the error message when the fetch or the calculations failed.
+    Throttled requests are retried and an open circuit pauses fetching rather than failing
+    the rest of the batch."""
+    provider = provider if provider is not None else provider_from_env()
+    if not provider.cacheable or cache is False:
+        cache = None
+    elif cache is True:
+        cache = get_default_cache()
+    fetcher = AsyncFetcher(provider, per_host=fetch_workers, wait_for_breaker=True)
+    events = queue.Queue()
+
+    def computed(ticker, future):
+        try:
+            tables, warnings = future.result()
+        except Exception as e:
+            return ticker, None, None, f"compute: {e}"
+        return ticker, tables, warnings, None
+
+    # Spawned, not forked: a forked worker would inherit the cache's sqlite connection and
+    # locks mid-use from the fetch threads and can block on them forever
+    with ProcessPoolExecutor(max_workers=compute_workers, mp_context=get_context("spawn")) as computers:
+        handed_over = []
+
+        def on_fetched(ticker, results, failures):
+            # Fetched payloads go on to the process pool, computed tables back to the caller
+            handed_over.append(ticker)
+            if failures:
+                endpoint, e = next(iter(failures.items()))
+                events.put((ticker, None, None, f"fetch: Failed to fetch {endpoint} data for {ticker}. Error: {e}"))
+                return
+            try:
+                future = computers.submit(compute_ticker, ticker, results, cache.path if cache is not None else None)
+            except Exception as e:
+                # A dead worker breaks the pool, every later submit raises
+                events.put((ticker, None, None, f"compute: {e}"))
+                return
+            future.add_done_callback(lambda future: events.put(computed(ticker, future)))
+
+        def fetch_all():
+            try:
+                asyncio.run(fetch_universe(fetcher, tickers, cache, on_fetched, in_flight=fetch_workers))
+            except Exception as e:
+                # Without this the caller would wait forever for the tickers never handed over
+                events.put((None, None, None, e))
+
+        threading.Thread(target=fetch_all, daemon=True).start()
+        remaining = len(tickers)
+        while remaining:
+            ticker, tables, warnings, error = events.get()
+            if ticker is None:
+                for ticker in (Counter(tickers) - Counter(handed_over)).elements():
+                    remaining -= 1
+                    yield ticker, None, None, f"fetch: {error!r}"
+                continue
+            remaining -= 1
+            yield ticker, tables, warnings, error
+
+
+def run_batch(tickers, out, fmt="csv", **kwargs):
+    """Runs the whole batch, writing one file per table into `out`.
+
+    Returns the tickers that succeeded and the error message of every one that failed."""
+    if fmt == "parquet":
+        import pyarrow  # noqa: F401  fail before fetching anything rather than at the first write
+
+    os.makedirs(out, exist_ok=True)
+    sinks = {name: SINKS[fmt](os.path.join(out, f"{name}.{fmt}")) for name in TABLES}
+    done, failed = [], {}
+    for ticker, tables, warnings, error in iter_batch(tickers, **kwargs):
+        if error is not None:
+            failed[ticker] = error
+            message = f"FAILED ({error})"
+        else:
+            for name, df in tables.items():
+                if not df.empty:
+                    sinks[name].write(df)
+            done.append(ticker)
+            message = f"ok ({len(warnings)} warnings)" if warnings else "ok"
+        print(f"[{len(done) + len(failed)}/{len(tickers)}] {ticker} {message}", file=sys.stderr)
+
+    for sink in sinks.values():
+        sink.close()
+    if failed:
+        pd.DataFrame({"Ticker": list(failed), "Error": list(failed.values())}).to_csv(
+            os.path.join(out, "failures.csv"), index=False)
+    return done, failed
+
+
+def read_tickers(args):
+    tickers = list(args.tickers)
+    if args.file:
+        with open(args.file) as f:
+            tickers += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    # Upper-cased and de-duplicated, keeping the given order
+    return list(dict.fromkeys(ticker.upper() for ticker in tickers))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("tickers", nargs="*")
+    parser.add_argument("--file", help="text file with one ticker per line")
+    parser.add_argument("--out", default="batch_output", help="directory the result files are written to")
+    parser.add_argument("--format", choices=list(SINKS), default="csv")
+    parser.add_argument("--fetch-workers", type=int, default=FETCH_WORKERS, help="tickers fetched at once, also the most requests in flight per host")
+    parser.add_argument("--compute-workers", type=int, help="processes for the calculations, one per CPU by default")
+    parser.add_argument("--no-cache", action="store_true", help="always fetch instead of reading the disk cache")
+    args = parser.parse_args()
+
+    tickers = read_tickers(args)
+    if not tickers:
+        parser.error("no tickers given")
+
+    start = time.perf_counter()
+    done, failed = run_batch(
+        tickers, args.out, fmt=args.format, fetch_workers=args.fetch_workers,
+        compute_workers=args.compute_workers, cache=not args.no_cache)
+    print(f"{len(done)} tickers done, {len(failed)} failed in {time.perf_counter() - start:.1f}s, results in {args.out}",
+          file=sys.stderr)
+    http_stats = shared_session_stats()
+    if http_stats:
+        print(f"HTTP: {http_stats['requests']} requests over {http_stats['new_connections']} connections, "
+              f"{http_stats['reuse_rate']:.0%} reused", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Cached batch run on a process pool, cold and again with the derived frames memoized.
+
+Run from the repository root:  python -m benchmarks.bench_batch --tickers 6 --compute-workers 2
+Fails instead of hanging if a worker never reports back.
+"""
+import argparse
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+from batch import iter_batch
+from benchmarks.synthetic import write_fixtures
+import cache
+from cache import DiskCache
+from providers import ReplayProvider
+
+
+class CachedReplayProvider(ReplayProvider):
+    # Replayed payloads go through the disk cache like Yahoo's would
+    cacheable = True
+
+
+def timed_batch(tickers, timeout, **kwargs):
+    """Every ticker's tables and the seconds the batch took, exiting once `timeout` seconds pass without it finishing"""
+    results = queue.Queue()
+    thread = threading.Thread(target=lambda: results.put(list(iter_batch(tickers, **kwargs))), daemon=True)
+    start = time.perf_counter()
+    thread.start()
+    try:
+        out = results.get(timeout=timeout)
+    except queue.Empty:
+        print(f"FAILED: batch of {len(tickers)} tickers did not finish within {timeout}s", file=sys.stderr)
+        # Exiting normally would wait on the stuck pool workers forever
+        os._exit(1)
+    errors = {ticker: error for ticker, _, _, error in out if error is not None}
+    assert not errors, errors
+    return {ticker: tables for ticker, tables, _, _ in out}, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=6)
+    parser.add_argument("--compute-workers", type=int, default=2)
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        tickers = write_fixtures(root, args.tickers)
+        # The process-wide default cache, as the CLI and the Screener use it, kept out of the real cache directory
+        cache.default_cache = DiskCache(os.path.join(root, "cache.sqlite"))
+        kwargs = dict(provider=CachedReplayProvider(root), cache=True, compute_workers=args.compute_workers)
+        cold, cold_time = timed_batch(tickers, args.timeout, **kwargs)
+        warm, warm_time = timed_batch(tickers, args.timeout, **kwargs)
+
+    for ticker, tables in cold.items():
+        for name, df in tables.items():
+            pd.testing.assert_frame_equal(warm[ticker][name], df, check_dtype=False)
+    print(f"{args.tickers} tickers, {args.compute_workers} compute workers (tables identical)")
+    print(f"cold     : {cold_time:8.2f} s")
+    print(f"memoized : {warm_time:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
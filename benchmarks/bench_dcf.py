@@ -0,0 +1,45 @@
+"""Time of one Monte Carlo DCF valuation per ticker, all scenarios in one broadcast pass.
+
+Run from the repository root:  python -m benchmarks.bench_dcf --tickers 20 --scenarios 100000
+"""
+import argparse
+import tempfile
+import time
+
+from benchmarks.synthetic import write_fixtures
+from dcf import SCENARIOS, simulate, summarize
+from providers import ReplayProvider
+from stock import stock
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=20)
+    parser.add_argument("--scenarios", type=int, default=SCENARIOS)
+    args = parser.parse_args()
+
+    inputs = []
+    with tempfile.TemporaryDirectory() as root:
+        provider = ReplayProvider(root)
+        for ticker in write_fixtures(root, args.tickers):
+            stock_obj = stock(ticker, provider=provider, cache=False)
+            stock_obj.calculate_quarterly_ratios()
+            stock_obj.calculate_yearly_ratios()
+            inputs.append(stock_obj.dcf_inputs())
+    inputs = [x for x in inputs if x is not None]
+
+    timings = []
+    for x in inputs:
+        start = time.perf_counter()
+        values = simulate(x["revenue"], x["assumptions"], x["net_debt"], x["shares"], scenarios=args.scenarios)
+        summarize(values)
+        timings.append(time.perf_counter() - start)
+
+    timings.sort()
+    print(f"{len(inputs)} tickers, {args.scenarios:,} scenarios each")
+    print(f"median : {timings[len(timings) // 2] * 1000:8.1f} ms/valuation")
+    print(f"worst  : {timings[-1] * 1000:8.1f} ms/valuation")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Bytes a fully computed `stock` holds, as loaded and after `compact()`.
+
+Run from the repository root:  python -m benchmarks.bench_memory --tickers 50
+"""
+import argparse
+import tempfile
+
+from benchmarks.synthetic import write_fixtures
+from cache import MEMORY_BUDGET
+from providers import ReplayProvider
+from ratios import apply_piotroski_overrides
+from stock import stock
+
+
+def load(ticker, provider):
+    stock_obj = stock(ticker, provider=provider, cache=False)
+    stock_obj.calculate_quarterly_ratios()
+    stock_obj.calculate_yearly_ratios()
+    stock_obj.calculate_ttm_ratios()
+    stock_obj.one_time_ratios()
+    stock_obj.piotroski_f_score_yearly()
+    # Built by the first price chart, so a cached object soon holds it either way
+    stock_obj.price_levels()
+    return stock_obj
+
+
+def check_overrides(stock_obj):
+    # The dashboard applies saved Piotroski overrides to the compacted scores
+    scores = stock_obj.f_score_y
+    flipped = {year: 1 - value for year, value in scores["No New Shares Issued"].items()}
+    overridden = apply_piotroski_overrides(scores, flipped)
+    assert (overridden["F Score"] - scores["F Score"] == overridden["No New Shares Issued"] - scores["No New Shares Issued"]).all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--quarters", type=int, default=6)
+    parser.add_argument("--years", type=int, default=5)
+    args = parser.parse_args()
+
+    full, compact = 0, 0
+    with tempfile.TemporaryDirectory() as root:
+        provider = ReplayProvider(root)
+        for ticker in write_fixtures(root, args.tickers, quarters=args.quarters, years=args.years):
+            stock_obj = load(ticker, provider)
+            full += stock_obj.memory_usage()
+            stock_obj.compact()
+            compact += stock_obj.memory_usage()
+            check_overrides(stock_obj)
+
+    full, compact = full / args.tickers, compact / args.tickers
+    print(f"{args.tickers} tickers, {args.quarters} quarters, {args.years} years")
+    print(f"as loaded : {full / 1024:8.1f} KB/ticker, {MEMORY_BUDGET / full:8.0f} tickers per cache budget")
+    print(f"compact   : {compact / 1024:8.1f} KB/ticker, {MEMORY_BUDGET / compact:8.0f} tickers per cache budget")
+    print(f"ratio     : {full / compact:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
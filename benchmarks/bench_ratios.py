@@ -0,0 +1,73 @@
+"""Microbenchmark of the ratio and Piotroski engines against the per-date loops they replaced.
+
+Run from the repository root:  python -m benchmarks.bench_ratios --tickers 50
+"""
+import argparse
+import copy
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks import legacy
+from benchmarks.synthetic import write_fixtures
+from providers import ReplayProvider
+from ratios import piotroski_scores
+from stock import stock
+
+
+def time_calls(objects, *calls):
+    start = time.perf_counter()
+    for obj in objects:
+        for call in calls:
+            call(obj)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--quarters", type=int, default=6)
+    parser.add_argument("--years", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        tickers = write_fixtures(root, args.tickers, quarters=args.quarters, years=args.years)
+        provider = ReplayProvider(root)
+        base = [stock(ticker, provider=provider) for ticker in tickers]
+    old = copy.deepcopy(base)
+    new = copy.deepcopy(base)
+
+    loop_time = time_calls(old, legacy.calculate_quarterly_ratios, legacy.calculate_yearly_ratios)
+    engine_time = time_calls(new, stock.calculate_quarterly_ratios, stock.calculate_yearly_ratios)
+
+    for a, b in zip(old, new):
+        for name in ("qfinancials", "qratios", "yfinancials", "yratios"):
+            pd.testing.assert_frame_equal(getattr(a, name), getattr(b, name))
+
+    score_loop_time = time_calls(old, legacy.piotroski_f_score_yearly)
+    score_time = time_calls(new, stock.piotroski_f_score_yearly)
+
+    # The whole universe scored at once, as one (ticker, date) panel
+    start = time.perf_counter()
+    financials = pd.concat({obj.ticker: obj.yfinancials for obj in new}, names=["Ticker"])
+    ratios = pd.concat({obj.ticker: obj.yratios for obj in new}, names=["Ticker"])
+    panel = piotroski_scores(financials, ratios)
+    panel_time = time.perf_counter() - start
+
+    for a, b in zip(old, new):
+        pd.testing.assert_frame_equal(a.f_score_y, b.f_score_y)
+        pd.testing.assert_frame_equal(panel.loc[a.ticker], a.f_score_y)
+
+    per_ticker = lambda seconds: seconds / args.tickers * 1000
+    print(f"{args.tickers} tickers, {args.quarters} quarters, {args.years} years (frames identical)")
+    print(f"per-date loop : {per_ticker(loop_time):8.2f} ms/ticker")
+    print(f"column engine : {per_ticker(engine_time):8.2f} ms/ticker")
+    print(f"speedup       : {loop_time / engine_time:8.1f}x")
+    print(f"piotroski loop  : {per_ticker(score_loop_time):8.3f} ms/ticker")
+    print(f"piotroski engine: {per_ticker(score_time):8.3f} ms/ticker")
+    print(f"piotroski panel : {per_ticker(panel_time):8.3f} ms/ticker, {len(panel)} rows in one pass")
+
+
+if __name__ == "__main__":
+    main()
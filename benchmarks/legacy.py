@@ -0,0 +1,273 @@
+import numpy as np
+import pandas as pd
+
+# The per-date `.loc` implementations the columnar engine in `ratios.py` replaced.
+# Kept only so the benchmarks can time it and check both produce the same frames.
+
+def period_close(self, date):
+    # Last close on or before the statement date
+    closes = self.ypricehistory["Close"]
+    closes = closes[closes.index.tz_localize(None) <= date]
+    return closes.iloc[-1] if len(closes) else np.nan
+
+
+def period_market_cap(self, balance_sheet, date):
+    shares = self.get_safe_value(balance_sheet, "Ordinary Shares Number", date, default=np.nan)
+    market_cap = period_close(self, date) * shares
+    return self.info.get("marketCap") if pd.isna(market_cap) else market_cap
+
+
+def calculate_quarterly_ratios(self):
+    if self.q_dates.empty:
+        self.errors.append(f"No quarterly data available for {self.ticker} to calculate ratios.")
+        return
+
+    for date in self.q_dates:
+        try:
+            # Calculating Financials
+            revenue = self.get_safe_value(self.q_income_stmt, "Total Revenue", date, default=np.nan)
+            net_income = self.get_safe_value(self.q_income_stmt, "Net Income", date, default=np.nan)
+            gross_profit = self.get_safe_value(self.q_income_stmt, "Gross Profit", date, default=np.nan)
+            operating_income = self.get_safe_value(self.q_income_stmt, "Operating Income", date, default=np.nan)
+            total_assets = self.get_safe_value(self.q_balance_sheet, "Total Assets", date, default=np.nan)
+            total_liabilities = self.get_safe_value(self.q_balance_sheet, "Total Liabilities Net Minority Interest", date, default=np.nan)
+            equity = self.get_safe_value(self.q_balance_sheet, "Stockholders Equity", date, default=np.nan)
+            current_assets = self.get_safe_value(self.q_balance_sheet, "Current Assets", date, default=np.nan)
+            current_liabilities = self.get_safe_value(self.q_balance_sheet, "Current Liabilities", date, default=np.nan)
+
+            inventory = self.get_safe_value(self.q_balance_sheet, "Inventory", date, default=np.nan)
+            cash = self.get_safe_value(self.q_balance_sheet, "Cash And Cash Equivalents", date, default=np.nan)
+            receivables = self.get_safe_value(self.q_balance_sheet, "Accounts Receivable", date, default=np.nan)
+            invested_capital = self.get_safe_value(self.q_balance_sheet, "Invested Capital", date, default=np.nan)
+            retained_earnings = self.get_safe_value(self.q_balance_sheet, "Retained Earnings", date, default=np.nan)
+            ebit = self.get_safe_value(self.q_income_stmt, "EBIT", date, default=np.nan)
+            if pd.isna(ebit):
+                ebit = self.get_safe_value(self.q_income_stmt, "Operating Income", date, default=np.nan)
+            market_cap = period_market_cap(self, self.q_balance_sheet, date)
+
+
+            op_cashflow = self.get_safe_value(self.q_cashflow_stmt, "Operating Cash Flow", date, default=0)
+            capex = self.get_safe_value(self.q_cashflow_stmt, "Capital Expenditure", date, default=0)
+            free_cash_flow = op_cashflow - capex if pd.notnull(op_cashflow) else np.nan
+            working_capital = current_assets - current_liabilities
+
+            # Storing the above Financials
+            self.qfinancials.loc[date, "Revenue"] = revenue
+            self.qfinancials.loc[date, "Net Income"] = net_income
+            self.qfinancials.loc[date, "Gross Profit"] = gross_profit
+            self.qfinancials.loc[date, "Operating Income"] = operating_income
+
+            self.qfinancials.loc[date, "Total Assets"] = total_assets
+            self.qfinancials.loc[date, "Total Liabilities"] = total_liabilities
+            self.qfinancials.loc[date, "Equity"] = equity
+            self.qfinancials.loc[date, "Current Assets"] = current_assets
+            self.qfinancials.loc[date, "Current Liabilities"] = current_liabilities
+            self.qfinancials.loc[date, "Inventory"] = inventory
+            self.qfinancials.loc[date, "Cash"] = cash
+            self.qfinancials.loc[date, "Receivables"] = receivables
+            self.qfinancials.loc[date, "Invested Capital"] = invested_capital
+            self.qfinancials.loc[date, "Retained Earnings"] = retained_earnings
+            self.qfinancials.loc[date, "EBIT"] = ebit
+            self.qfinancials.loc[date, "Free Cash Flow"] = free_cash_flow
+
+            self.qfinancials.loc[date, "Operating Cash Flow"] = op_cashflow
+            self.qfinancials.loc[date, "Capital Expenditure"] = capex
+            self.qfinancials.loc[date, "Free Cash Flow"] = free_cash_flow
+            self.qfinancials.loc[date, "Working Capital"] = working_capital
+
+            # Calculating and storing Financials
+            self.qratios.loc[date, "Net Profit Margin"] =( net_income / revenue) * 100 if revenue else np.nan
+            self.qratios.loc[date, "Gross Margin"] = (gross_profit / revenue) * 100 if revenue else np.nan
+            self.qratios.loc[date, "Operating Margin"] = (operating_income / revenue) * 100 if revenue else np.nan
+            self.qratios.loc[date, "ROA"] = (net_income / total_assets) * 100 if total_assets else np.nan
+            self.qratios.loc[date, "ROE"] = (net_income / equity) * 100 if equity else np.nan
+            self.qratios.loc[date, "Current Ratio"] = current_assets / current_liabilities if current_liabilities else np.nan
+            self.qratios.loc[date, "Quick Ratio"] = (current_assets - inventory) / current_liabilities if current_liabilities else np.nan
+            self.qratios.loc[date, "Cash Ratio"] = cash / current_liabilities if current_liabilities else np.nan
+            self.qratios.loc[date, "Debt-to-Equity"] = total_liabilities / equity if equity else np.nan
+            self.qratios.loc[date, "Debt Ratio"] = total_liabilities / total_assets if total_assets else np.nan
+            self.qratios.loc[date, "Cash Flow Margin"] = (op_cashflow / revenue) * 100 if revenue else np.nan
+            self.qratios.loc[date, "Inventory Turnover"] = revenue / inventory if inventory else np.nan
+            self.qratios.loc[date, "Asset Turnover"] = revenue / total_assets if total_assets else np.nan
+            self.qratios.loc[date, "Receivables Turnover"] = revenue / receivables if receivables else np.nan
+            self.qratios.loc[date, "CapEx Intensity"] = (capex / revenue) * 100 if revenue else np.nan
+            self.qratios.loc[date, "ROCE"] = (operating_income / invested_capital) * 100 if invested_capital else np.nan
+            self.qratios.loc[date, "FCF Conversion"] = (free_cash_flow / net_income) * 100 if net_income else np.nan
+            self.qratios.loc[date, 'Financial Leverage'] = total_assets / equity if equity else np.nan
+
+            # Altman-Z Score
+            if all(pd.notnull([working_capital, total_assets, retained_earnings, ebit, market_cap, total_liabilities, revenue])):
+                A = working_capital / total_assets if total_assets else 0
+                B = retained_earnings / total_assets if total_assets else 0
+                C = ebit / total_assets if total_assets else 0
+                D = market_cap / total_liabilities if total_liabilities else 0
+                E = revenue / total_assets if total_assets else 0
+                z_score = 1.2 * A + 1.4 * B + 3.3 * C + 0.6 * D + 1.0 * E
+                self.qratios.loc[date, "Altman Z-Score"] = z_score
+            else:
+                self.qratios.loc[date, "Altman Z-Score"] = np.nan
+
+        except Exception as e:
+            self.errors.append(f"Could not calculate quarterly ratios for {self.ticker} on {date}. Reason: {e}")
+
+
+    growth_cols = [ "Revenue", "Net Income", "Gross Profit", "Operating Income", "Operating Cash Flow", "Free Cash Flow", "EBIT" ]
+
+    for col in growth_cols:
+        if col in self.qfinancials.columns:
+            self.qfinancials[f"{col} QoQ"] = self.qfinancials[col].pct_change(fill_method=None).round(4) * 100
+
+    self.format_ratios(type='q')
+    self.qfinancials.dropna(inplace = True)
+    self.qratios.dropna(inplace = True)
+
+def calculate_yearly_ratios(self):
+    if self.y_dates.empty:
+        self.errors.append(f"No yearly data available for {self.ticker} to calculate ratios.")
+        return
+
+    for date in self.y_dates:
+        try:
+            # Pull values from yearly financials
+            revenue = self.y_income_stmt.loc[date, "Total Revenue"]
+            net_income = self.y_income_stmt.loc[date, "Net Income"]
+            gross_profit = self.y_income_stmt.loc[date, "Gross Profit"]
+            operating_income = self.y_income_stmt.loc[date, "Operating Income"]
+            total_assets = self.y_balance_sheet.loc[date, "Total Assets"]
+            total_liabilities = self.y_balance_sheet.loc[date, "Total Liabilities Net Minority Interest"]
+            equity = self.y_balance_sheet.loc[date, "Stockholders Equity"]
+            current_assets = self.y_balance_sheet.loc[date, "Current Assets"]
+            current_liabilities = self.y_balance_sheet.loc[date, "Current Liabilities"]
+
+            inventory = self.get_safe_value(self.y_balance_sheet, "Inventory", date)
+            cash = self.get_safe_value(self.y_balance_sheet, "Cash And Cash Equivalents", date)
+            receivables = self.get_safe_value(self.y_balance_sheet, "Accounts Receivable", date)
+            invested_capital = self.get_safe_value(self.y_balance_sheet, "Invested Capital", date)
+            retained_earnings = self.get_safe_value(self.y_balance_sheet, "Retained Earnings", date)
+            ebit = self.get_safe_value(self.y_income_stmt, "EBIT", date)
+            if pd.isna(ebit):
+                ebit = self.get_safe_value(self.y_income_stmt, "Operating Income", date)
+
+            op_cash_flow = self.y_cashflow_stmt.loc[date, "Operating Cash Flow"]
+            capex = self.get_safe_value(self.y_cashflow_stmt, "Capital Expenditure", date, default=0)
+            free_cash_flow = op_cash_flow - capex
+            working_capital = current_assets - current_liabilities
+
+            # Store financials
+            self.yfinancials.loc[date, "Revenue"] = revenue
+            self.yfinancials.loc[date, "Net Income"] = net_income
+            self.yfinancials.loc[date, "Gross Profit"] = gross_profit
+            self.yfinancials.loc[date, "Operating Income"] = operating_income
+            self.yfinancials.loc[date, "Total Assets"] = total_assets
+            self.yfinancials.loc[date, "Total Liabilities"] = total_liabilities
+            self.yfinancials.loc[date, "Equity"] = equity
+            self.yfinancials.loc[date, "Current Assets"] = current_assets
+            self.yfinancials.loc[date, "Current Liabilities"] = current_liabilities
+            self.yfinancials.loc[date, "Inventory"] = inventory
+            self.yfinancials.loc[date, "Cash"] = cash
+            self.yfinancials.loc[date, "Receivables"] = receivables
+            self.yfinancials.loc[date, "Invested Capital"] = invested_capital
+            self.yfinancials.loc[date, "Retained Earnings"] = retained_earnings
+            self.yfinancials.loc[date, "EBIT"] = ebit
+            self.yfinancials.loc[date, "Operating Cash Flow"] = op_cash_flow
+            self.yfinancials.loc[date, "Capital Expenditure"] = capex
+            self.yfinancials.loc[date, "Free Cash Flow"] = free_cash_flow
+            self.yfinancials.loc[date, "Working Capital"] = working_capital
+
+            # Ratios
+            self.yratios.loc[date, "Net Profit Margin"] = (net_income / revenue) * 100 if revenue else np.nan
+            self.yratios.loc[date, "Gross Margin"] = (gross_profit / revenue) * 100 if revenue else np.nan
+            self.yratios.loc[date, "Operating Margin"] = (operating_income / revenue) * 100 if revenue else np.nan
+            self.yratios.loc[date, "ROA"] =( net_income / total_assets) * 100 if total_assets else np.nan
+            self.yratios.loc[date, "ROE"] = (net_income / equity) * 100 if equity else np.nan
+            self.yratios.loc[date, "Current Ratio"] = current_assets / current_liabilities if current_liabilities else np.nan
+            self.yratios.loc[date, "Quick Ratio"] = (current_assets - inventory) / current_liabilities if current_liabilities else np.nan
+            self.yratios.loc[date, "Cash Ratio"] = cash / current_liabilities if current_liabilities else np.nan
+            self.yratios.loc[date, "Debt-to-Equity"] = total_liabilities / equity if equity else np.nan
+            self.yratios.loc[date, "Debt Ratio"] = total_liabilities / total_assets if total_assets else np.nan
+            self.yratios.loc[date, "Cash Flow Margin"] = (op_cash_flow / revenue) * 100 if revenue else np.nan
+            self.yratios.loc[date, "Inventory Turnover"] = revenue / inventory if inventory else np.nan
+            self.yratios.loc[date, "Asset Turnover"] = revenue / total_assets if total_assets else np.nan
+            self.yratios.loc[date, "Receivables Turnover"] = revenue / receivables if receivables else np.nan
+            self.yratios.loc[date, "CapEx Intensity"] = (capex / revenue) * 100 if revenue else np.nan
+            self.yratios.loc[date, "ROCE"] = (operating_income / invested_capital) * 100 if invested_capital else np.nan
+            self.yratios.loc[date, "FCF Conversion"] = (free_cash_flow / net_income) * 100 if net_income else np.nan
+            self.yratios.loc[date, 'Financial Leverage'] = total_assets / equity if equity else np.nan
+
+        except Exception as e:
+            self.errors.append(f"Could not calculate yearly ratios for {self.ticker} on {date}. Reason: {e}")
+
+    growth_cols = [ "Revenue", "Net Income", "Gross Profit", "Operating Income", "Operating Cash Flow", "Free Cash Flow", "EBIT" ]
+
+    for col in growth_cols:
+        if col in self.yfinancials.columns:
+            self.yfinancials[f"{col} YoY"] = self.yfinancials[col].pct_change(fill_method=None).round(4) * 100
+
+    self.format_ratios(type='y')
+
+def piotroski_f_score_yearly(self):
+    piotroski_columns = [
+        "Net Income",
+        "ROA",
+        "Operating Cash Flow",
+        "Operating Cash Flow > Net Income",
+        "Lower Debt/Equity vs Last Year",
+        "Higher Current Ratio vs Last Year",
+        "No New Shares Issued",  # will be filled later
+        "Higher Gross Margin vs Last Year",
+        "Higher Asset Turnover vs Last Year"
+    ]
+
+    rows = []
+
+    def gv(col, year):
+        return self.yfinancials.loc[year, col] if col in self.yfinancials.columns else np.nan
+
+    def gr(col, year):
+        return self.yratios.loc[year, col] if col in self.yratios.columns else np.nan
+
+    for i in range(1, len(self.y_dates)):
+        year = self.y_dates[i]
+        prev_year = self.y_dates[i-1]
+
+        row = {col: 0 for col in piotroski_columns}
+        row["Year"] = year.year
+
+        if gv("Net Income", year) > 0:
+            row["Net Income"] = 1
+
+        if gr("ROA", year) > 0:
+            row["ROA"] = 1
+
+        if gv("Operating Cash Flow", year) > 0:
+            row["Operating Cash Flow"] = 1
+
+        if gv("Operating Cash Flow", year) > gv("Net Income", year):
+            row["Operating Cash Flow > Net Income"] = 1
+
+        debt_curr = gr("Debt Ratio", year)
+        debt_prev = gr("Debt Ratio", prev_year)
+        if pd.notna(debt_curr) and pd.notna(debt_prev) and debt_curr < debt_prev:
+            row["Lower Debt/Equity vs Last Year"] = 1
+
+        curr_curr = gr("Current Ratio", year)
+        curr_prev = gr("Current Ratio", prev_year)
+        if pd.notna(curr_curr) and pd.notna(curr_prev) and curr_curr > curr_prev:
+            row["Higher Current Ratio vs Last Year"] = 1
+
+        gm_curr = gr("Gross Margin", year)
+        gm_prev = gr("Gross Margin", prev_year)
+        if pd.notna(gm_curr) and pd.notna(gm_prev) and gm_curr > gm_prev:
+            row["Higher Gross Margin vs Last Year"] = 1
+
+        at_curr = gr("Asset Turnover", year)
+        at_prev = gr("Asset Turnover", prev_year)
+        if pd.notna(at_curr) and pd.notna(at_prev) and at_curr > at_prev:
+            row["Higher Asset Turnover vs Last Year"] = 1
+
+        rows.append(row)
+
+    self.f_score_y = pd.DataFrame(rows)
+    self.f_score_y.set_index("Year", inplace=True)
+    self.f_score_y = self.f_score_y[piotroski_columns]
+    self.f_score_y['F Score'] = self.f_score_y.sum(axis = 1)
@@ -0,0 +1,152 @@
+"""Benchmark suite for the fetch, compute and render stages of the dashboard.
+
+Replays synthetic fixtures, so no network is needed. Run from the repository root:
+    python -m benchmarks.run --out bench.json
+    python -m benchmarks.run --out new.json --baseline bench.json
+The second form exits non-zero when a stage got slower than --threshold allows.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import write_fixtures
+from charts import candlestick_figure, group_figure
+from data import FINANCIAL_GROUPS_Q, FINANCIAL_GROUPS_Y, RATIO_GROUPS
+from formatting import round_df, scale_df
+from providers import ReplayProvider
+from stock import stock
+
+SIZES = [1, 50, 500]
+
+
+def scale_groups(stock_obj):
+    for cols in FINANCIAL_GROUPS_Q.values():
+        available = [col for col in cols if col in stock_obj.qfinancials.columns]
+        scale_df(stock_obj.qfinancials, available)
+    for cols in FINANCIAL_GROUPS_Y.values():
+        available = [col for col in cols if col in stock_obj.yfinancials.columns]
+        scale_df(stock_obj.yfinancials, available)
+
+
+def group_figures(stock_obj):
+    for group_name, cols in FINANCIAL_GROUPS_Q.items():
+        available = [col for col in cols if col in stock_obj.qfinancials.columns]
+        plot_df = scale_df(stock_obj.qfinancials, available)
+        plot_df['Quarter_Label'] = plot_df['Year'].astype(str) + ' Q' + plot_df['Quarter'].astype(str)
+        group_figure(plot_df, group_name, 'Quarter_Label', 'Quarter')
+    for group_name, cols in RATIO_GROUPS.items():
+        available = [col for col in cols if col in stock_obj.yratios.columns]
+        if available:
+            group_figure(round_df(stock_obj.yratios, available), group_name, 'Year', 'Years')
+
+
+# Stage name and the call it times, in the order the dashboard runs them
+STAGES = [
+    ("calculate_quarterly_ratios", lambda s: s.calculate_quarterly_ratios()),
+    ("calculate_yearly_ratios", lambda s: s.calculate_yearly_ratios()),
+    ("calculate_ttm_ratios", lambda s: s.calculate_ttm_ratios()),
+    ("one_time_ratios", lambda s: s.one_time_ratios()),
+    ("piotroski_f_score_yearly", lambda s: s.piotroski_f_score_yearly()),
+    ("scale_df", scale_groups),
+    ("candlestick_figure", lambda s: (candlestick_figure(s, 'Quarterly'), candlestick_figure(s, 'Yearly'))),
+    ("group_figures", group_figures),
+]
+
+
+def summarize(samples):
+    samples = np.array(samples) * 1000
+    return {
+        "total_ms": float(samples.sum()),
+        "mean_ms": float(samples.mean()),
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p95_ms": float(np.percentile(samples, 95)),
+        "max_ms": float(samples.max()),
+    }
+
+
+def run_size(provider, tickers):
+    timings = {"construct": []}
+    timings.update({name: [] for name, _ in STAGES})
+    for ticker in tickers:
+        start = time.perf_counter()
+        stock_obj = stock(ticker, provider=provider)
+        timings["construct"].append(time.perf_counter() - start)
+        for name, call in STAGES:
+            start = time.perf_counter()
+            call(stock_obj)
+            timings[name].append(time.perf_counter() - start)
+    return {name: summarize(samples) for name, samples in timings.items()}
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Returns (size, stage, old, new) for every stage whose mean got slower than the threshold allows."""
+    regressions = []
+    for size, stages in results.items():
+        for name, stats in stages.items():
+            old = baseline.get(size, {}).get(name)
+            if old and stats["mean_ms"] > old["mean_ms"] * (1 + threshold):
+                regressions.append((size, name, old["mean_ms"], stats["mean_ms"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="number of synthetic tickers per run")
+    parser.add_argument("--out", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown of a stage's mean, 0.2 = 20%%")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as root:
+        tickers = write_fixtures(root, max(args.sizes))
+        provider = ReplayProvider(root)
+        for size in args.sizes:
+            results[str(size)] = run_size(provider, tickers[:size])
+            print(f"\n{size} tickers")
+            for name, stats in results[str(size)].items():
+                print(f"  {name:<28} mean {stats['mean_ms']:8.2f} ms   p95 {stats['p95_ms']:8.2f} ms   total {stats['total_ms']:10.1f} ms")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for size, name, old, new in regressions:
+            print(f"REGRESSION {name} @ {size} tickers: {old:.2f} ms -> {new:.2f} ms")
+        if regressions:
+            sys.exit(1)
+        print(f"\nNo stage slower than {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
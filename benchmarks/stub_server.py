@@ -0,0 +1,67 @@
+"""Local HTTP server that serves a fixtures directory like a flaky upstream.
+
+A share of requests is answered with 429 or 503, after an optional delay, so the
+fetch layer's rate limiting, retries and circuit breaker can be exercised offline:
+    python -m benchmarks.stub_server fixtures/ --port 8765 --fail-rate 0.2
+    DASHBOARD_FIXTURES=http://127.0.0.1:8765 python batch.py --file universe.txt
+"""
+import argparse
+import functools
+import random
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FlakyHandler(SimpleHTTPRequestHandler):
+    # Keep-alive, so clients can reuse their connections like they would against Yahoo
+    protocol_version = "HTTP/1.1"
+    fail_rate = 0.0
+    latency = 0.0
+    lock = threading.Lock()
+    counts = {}
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        status = 200
+        if random.random() < self.fail_rate:
+            status = random.choice([429, 503])
+        with self.lock:
+            self.counts[status] = self.counts.get(status, 0) + 1
+        if status != 200:
+            self.send_error(status)
+            return
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(root, port=0, fail_rate=0.0, latency=0.0):
+    """Starts the server on a background thread and returns it; `server.server_address` has the port picked"""
+    handler = type("Handler", (FlakyHandler,), {"fail_rate": fail_rate, "latency": latency, "counts": {}})
+    server = ThreadingHTTPServer(("127.0.0.1", port), functools.partial(handler, directory=root))
+    server.counts = handler.counts
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root", help="fixtures directory, as written by `python -m providers record`")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of requests answered with 429 or 503")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds every response is delayed")
+    args = parser.parse_args()
+
+    server = serve(args.root, args.port, args.fail_rate, args.latency)
+    print(f"Serving {args.root} on http://127.0.0.1:{server.server_address[1]}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
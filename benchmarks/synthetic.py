@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+from providers import save_fixture
+
+# Line items in the layout yfinance returns them: one row per item, one column per period
+INCOME_ROWS = ["Total Revenue", "Gross Profit", "Operating Income", "EBIT", "Net Income"]
+BALANCE_ROWS = [
+    "Total Assets", "Total Liabilities Net Minority Interest", "Stockholders Equity",
+    "Current Assets", "Current Liabilities", "Inventory", "Cash And Cash Equivalents",
+    "Accounts Receivable", "Invested Capital", "Retained Earnings",
+    "Long Term Debt", "Short Term Debt", "Ordinary Shares Number"
+]
+CASHFLOW_ROWS = ["Operating Cash Flow", "Capital Expenditure", "Free Cash Flow"]
+
+
+def period_ends(periods, freq, end="2025-06-30"):
+    return pd.date_range(end=end, periods=periods, freq="QE" if freq == "q" else "YE")
+
+
+def statements(rng, dates, scale):
+    n = len(dates)
+    revenue = scale * rng.uniform(0.8, 1.2, n)
+    gross = revenue * rng.uniform(0.3, 0.7, n)
+    operating = gross * rng.uniform(0.2, 0.6, n)
+    net = operating * rng.uniform(0.5, 0.9, n)
+    ebit = operating * rng.uniform(0.95, 1.05, n)
+    # yfinance leaves EBIT blank for some periods
+    ebit[rng.random(n) < 0.15] = np.nan
+
+    assets = revenue * rng.uniform(2, 4, n)
+    liabilities = assets * rng.uniform(0.3, 0.7, n)
+    current_assets = assets * rng.uniform(0.2, 0.5, n)
+    inventory = current_assets * rng.uniform(0, 0.3, n)
+    inventory[rng.random(n) < 0.1] = 0
+    balance = [
+        assets, liabilities, assets - liabilities,
+        current_assets, current_assets * rng.uniform(0.4, 1.2, n), inventory,
+        current_assets * rng.uniform(0.1, 0.4, n), current_assets * rng.uniform(0.1, 0.3, n),
+        assets * rng.uniform(0.5, 0.8, n), assets * rng.uniform(-0.1, 0.4, n),
+        liabilities * rng.uniform(0.2, 0.5, n), liabilities * rng.uniform(0, 0.1, n),
+        np.full(n, scale / 50) * rng.uniform(0.98, 1.02, n)
+    ]
+
+    op_cashflow = net * rng.uniform(0.8, 1.5, n)
+    capex = -revenue * rng.uniform(0.02, 0.1, n)
+    cashflow = [op_cashflow, capex, op_cashflow + capex]
+
+    # Newest period first, oldest period partly unreported, like yfinance
+    columns = dates[::-1]
+    frames = []
+    for rows, values in ((INCOME_ROWS, [revenue, gross, operating, ebit, net]), (BALANCE_ROWS, balance), (CASHFLOW_ROWS, cashflow)):
+        df = pd.DataFrame(np.array(values)[:, ::-1], index=rows, columns=columns)
+        df.iloc[rng.random(len(rows)) < 0.2, -1] = np.nan
+        frames.append(df)
+    return frames
+
+
+def price_history(rng, end, years, start_price):
+    index = pd.bdate_range(end=end, periods=252 * years, tz="America/New_York", name="Date")
+    close = start_price * np.exp(np.cumsum(rng.normal(0.0003, 0.015, len(index))))
+    open_ = close * np.exp(rng.normal(0, 0.005, len(index)))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, len(index)))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, len(index)))
+    volume = rng.integers(1_000_000, 50_000_000, len(index))
+    return pd.DataFrame({
+        "Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume,
+        "Dividends": 0.0, "Stock Splits": 0.0
+    }, index=index)
+
+
+def synthetic_ticker(ticker, seed=0, quarters=6, years=5):
+    """Builds every endpoint payload for a fake ticker, keyed like the yfinance attributes."""
+    rng = np.random.default_rng(seed)
+    scale = 10 ** rng.uniform(8, 11)
+    q_dates = period_ends(quarters, "q")
+    y_dates = period_ends(years, "y", end="2024-12-31")
+    quarterly = statements(rng, q_dates, scale)
+    yearly = statements(rng, y_dates, scale * 4)
+    history = price_history(rng, q_dates[-1], 7, rng.uniform(10, 500))
+    last = history["Close"].iloc[-1]
+    shares = quarterly[1].loc["Ordinary Shares Number"].iloc[0]
+
+    info = {
+        "longName": f"{ticker} Synthetic Corp",
+        "sector": "Technology", "industry": "Software", "exchange": "NMS", "country": "United States",
+        "companyOfficers": [{"name": "Jane Doe"}],
+        "currentPrice": last, "bookValue": last / rng.uniform(1, 8),
+        "marketCap": int(last * shares), "sharesOutstanding": int(shares),
+        "trailingPE": rng.uniform(5, 60), "trailingEps": rng.uniform(0.5, 20),
+        "earningsGrowth": rng.uniform(-0.2, 0.4), "dividendRate": rng.uniform(0, 3),
+        "dividendYield": rng.uniform(0, 3), "fiftyTwoWeekLow": history["Low"].tail(252).min(),
+        "fiftyTwoWeekHigh": history["High"].tail(252).max(),
+        "averageDailyVolume10Day": int(history["Volume"].tail(10).mean()),
+        "financialCurrency": "USD",
+    }
+    return {
+        "quarterly_financials": quarterly[0],
+        "quarterly_balance_sheet": quarterly[1],
+        "quarterly_cashflow": quarterly[2],
+        "info": info,
+        "financials": yearly[0],
+        "balance_sheet": yearly[1],
+        "cashflow": yearly[2],
+        "history_7y": history,
+    }
+
+
+def write_fixtures(root, count, quarters=6, years=5):
+    """Saves `count` synthetic tickers under `root` in the layout `ReplayProvider` reads."""
+    tickers = [f"SYN{i:04d}" for i in range(count)]
+    for seed, ticker in enumerate(tickers):
+        for endpoint, value in synthetic_ticker(ticker, seed=seed, quarters=quarters, years=years).items():
+            save_fixture(root, ticker, endpoint, value)
+    return tickers
@@ -0,0 +1,295 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+# Prices and `info` move every trading day, statements only when a company files
+ENDPOINT_TTLS = {
+    "info": 4 * HOUR,
+    "history_7y": 4 * HOUR,
+    "quarterly_financials": 3 * DAY,
+    "quarterly_balance_sheet": 3 * DAY,
+    "quarterly_cashflow": 3 * DAY,
+    "financials": 3 * DAY,
+    "balance_sheet": 3 * DAY,
+    "cashflow": 3 * DAY,
+    # Derived frames are stored with the fingerprint of their inputs and only reused on a match,
+    # so they can outlive the statements they came from
+    "derived_quarterly": 30 * DAY,
+    "derived_yearly": 30 * DAY,
+    "derived_piotroski": 30 * DAY,
+    "derived_ttm": 30 * DAY,
+}
+DEFAULT_TTL = HOUR
+
+CACHE_DIR = os.environ.get("DASHBOARD_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "dashboard"))
+DISK_BUDGET = 512 * 1024 * 1024
+MEMORY_BUDGET = 512 * 1024 * 1024
+MEMORY_TTL = 30 * 60
+
+
+def fingerprint(*parts):
+    """Content hash of frames and plain values, equal whenever they hold the same data"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(np.ascontiguousarray(part).tobytes())
+        elif isinstance(part, pd.DataFrame):
+            digest.update(pd.util.hash_pandas_object(part, index=True).to_numpy().tobytes())
+            digest.update(pd.util.hash_pandas_object(part.columns).to_numpy().tobytes())
+        else:
+            digest.update(repr(part).encode())
+        # Keeps ("ab", "c") and ("a", "bc") apart
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class DiskCache():
+    """SQLite store of raw endpoint payloads keyed by (ticker, endpoint).
+
+    Entries expire after their endpoint's TTL, and the least recently used ones
+    are evicted whenever the stored payloads grow past `budget` bytes."""
+
+    def __init__(self, path=None, budget=DISK_BUDGET, ttls=ENDPOINT_TTLS):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, "stock_cache.sqlite")
+        self.path = path
+        self.budget = budget
+        self.ttls = ttls
+        self.hits = 0
+        self.misses = 0
+        self.stale_reads = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    ticker TEXT, endpoint TEXT, payload BLOB, size INTEGER,
+                    fetched_at REAL, accessed_at REAL,
+                    PRIMARY KEY (ticker, endpoint)
+                )""")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (accessed_at)")
+
+    def get(self, ticker, endpoint):
+        """Returns the cached payload, or None if it is missing or older than its TTL."""
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT payload, fetched_at FROM entries WHERE ticker = ? AND endpoint = ?",
+                (ticker, endpoint)).fetchone()
+            if row is None or now - row[1] > self.ttls.get(endpoint, DEFAULT_TTL):
+                self.misses += 1
+                return None
+            with self.conn:
+                self.conn.execute(
+                    "UPDATE entries SET accessed_at = ? WHERE ticker = ? AND endpoint = ?",
+                    (now, ticker, endpoint))
+            self.hits += 1
+        return pickle.loads(zlib.decompress(row[0]))
+
+    def get_stale(self, ticker, endpoint):
+        """Returns the cached payload whatever its age, or None if there is none, for topping up incrementally."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT payload FROM entries WHERE ticker = ? AND endpoint = ?",
+                (ticker, endpoint)).fetchone()
+            if row is None:
+                return None
+            self.stale_reads += 1
+        return pickle.loads(zlib.decompress(row[0]))
+
+    def put(self, ticker, endpoint, value):
+        payload = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (ticker, endpoint, payload, len(payload), now, now))
+            self.evict()
+
+    def evict(self):
+        # Called with the lock held, drops least recently used entries until under budget
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.budget:
+            return
+        rows = self.conn.execute("SELECT ticker, endpoint, size FROM entries ORDER BY accessed_at").fetchall()
+        for ticker, endpoint, size in rows:
+            if total <= self.budget:
+                break
+            self.conn.execute("DELETE FROM entries WHERE ticker = ? AND endpoint = ?", (ticker, endpoint))
+            total -= size
+
+    def tickers(self):
+        """Every ticker with at least one cached payload, expired or not"""
+        with self.lock:
+            rows = self.conn.execute("SELECT DISTINCT ticker FROM entries ORDER BY ticker").fetchall()
+        return [row[0] for row in rows]
+
+    def clear(self, ticker=None):
+        with self.lock, self.conn:
+            if ticker is None:
+                self.conn.execute("DELETE FROM entries")
+            else:
+                self.conn.execute("DELETE FROM entries WHERE ticker = ?", (ticker,))
+
+    def stats(self):
+        with self.lock:
+            entries, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stale_reads": self.stale_reads,
+            "entries": entries,
+            "bytes": size,
+            "budget": self.budget,
+        }
+
+
+class SingleFlight():
+    """Lets only one call per key run at a time.
+
+    Callers that arrive while a key is in flight wait for that call and get
+    its result (or its exception) instead of starting their own."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self.lock:
+            future = self.in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self.in_flight[key] = Future()
+                self.started += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+
+    def stats(self):
+        with self.lock:
+            return {"started": self.started, "coalesced": self.coalesced, "in_flight": len(self.in_flight)}
+
+
+class MemoryCache():
+    """Thread-safe LRU of in-memory objects with a TTL and a byte budget.
+
+    `sizeof` measures each value when it is stored; the least recently used
+    values are dropped whenever their total goes past `budget`."""
+
+    def __init__(self, budget=MEMORY_BUDGET, ttl=MEMORY_TTL, sizeof=None):
+        self.budget = budget
+        self.ttl = ttl
+        self.sizeof = sizeof or (lambda value: value.memory_usage())
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.RLock()
+        self.flights = SingleFlight()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or time.monotonic() - entry[1] > self.ttl:
+                if entry is not None:
+                    self.discard(key)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        with self.lock:
+            self.discard(key)
+            self.entries[key] = (value, time.monotonic(), size)
+            self.size += size
+            # The newest entry is always kept, even when it alone is over budget
+            while self.size > self.budget and len(self.entries) > 1:
+                self.discard(next(iter(self.entries)))
+
+    def discard(self, key):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.size -= entry[2]
+
+    def get_or_create(self, key, factory):
+        """Returns the cached value, building it with `factory` at most once across concurrent callers."""
+        value = self.get(key)
+        if value is None:
+            value = self.flights.do(key, lambda: self.create(key, factory))
+        return value
+
+    def create(self, key, factory):
+        # A flight that finished just before this one started may already have stored the value
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] <= self.ttl:
+                return entry[0]
+        value = factory()
+        self.put(key, value)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self.entries),
+                "bytes": self.size,
+                "budget": self.budget,
+                "coalesced": self.flights.coalesced,
+            }
+
+
+default_cache = None
+default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    """Returns the process-wide disk cache, creating it on first use."""
+    global default_cache
+    with default_cache_lock:
+        if default_cache is None:
+            default_cache = DiskCache()
+        return default_cache
@@ -0,0 +1,120 @@
+import numpy as np
+import plotly.graph_objects as go
+
+from prices import visible_bars
+
+RANGE_TITLES = {
+    "3M": "Last 3 Months", "6M": "Last 6 Months", "1Y": "Last Year",
+    "2Y": "Last 2 Years", "5Y": "Last 5 Years", "Max": "Full History"
+}
+
+
+def candlestick_figure(stock_obj, view_mode, range_name=None):
+    """Builds the price history chart with a marker line on every report date
+
+    Candles come from the finest resolution that fits `range_name` within the bar budget."""
+    info = stock_obj.info
+
+    if view_mode == 'Yearly':
+        report_dates = stock_obj.y_dates
+        range_name = range_name or "Max"
+    else:
+        report_dates = stock_obj.q_dates
+        range_name = range_name or "2Y"
+    resolution, hist_data = visible_bars(stock_obj.price_levels(), range_name)
+
+    fig = go.Figure()
+    fig.add_trace(go.Candlestick(x=hist_data.index,
+                    open=hist_data['Open'],
+                    high=hist_data['High'],
+                    low=hist_data['Low'],
+                    close=hist_data['Close'], name='Price'))
+
+    if not hist_data.empty:
+        start = hist_data.index[0].tz_localize(None) if hist_data.index.tz else hist_data.index[0]
+        report_dates = report_dates[report_dates >= start]
+        fig.add_trace(report_date_markers(report_dates, hist_data['Low'].min(), hist_data['High'].max()))
+
+    fig.update_layout(
+        title=f'{info.get("longName", stock_obj.ticker)} Stock Price, {RANGE_TITLES[range_name]} ({resolution} Candles)',
+        yaxis_title=f'Price in {info.get("financialCurrency")}',
+        xaxis_rangeslider_visible=True,
+        hovermode='x unified',
+        template='plotly_dark' if view_mode == 'Yearly' else 'plotly',
+        height=800,
+        yaxis=dict(
+            fixedrange=False
+        )
+    )
+    return fig
+
+
+def report_date_markers(report_dates, low, high):
+    """Draws every report date as one dotted line trace, broken up with gaps, instead of one layout shape per date"""
+    count = len(report_dates)
+    x = np.empty(count * 3, dtype=object)
+    x[0::3] = report_dates
+    x[1::3] = report_dates
+    x[2::3] = None
+    y = np.tile([low, high, None], count)
+    return go.Scatter(
+        x=x, y=y,
+        mode='lines',
+        line=dict(color='royalblue', width=1, dash='dot'),
+        name='Report Dates',
+        hoverinfo='skip',
+        showlegend=False,
+        connectgaps=False
+    )
+
+
+def figure_size(fig):
+    """Rough bytes a figure holds, for budgeting the figure cache"""
+    return sum(len(trace.x) * 8 * 5 for trace in fig.data if trace.x is not None)
+
+
+def group_figure(plot_df, group_name, x_col, xaxis_title):
+    """Builds one line per metric column of a financial or ratio group"""
+    fig = go.Figure()
+    for col in plot_df.columns.difference(['Year', 'Quarter', 'Quarter_Label']):
+        fig.add_trace(go.Scatter(
+            x=plot_df[x_col],
+            y=plot_df[col],
+            mode='lines+markers',
+            name=col
+        ))
+
+    fig.update_layout(
+        title=group_name,
+        xaxis_title=xaxis_title,
+        yaxis_title='Values',
+        hovermode='x unified',
+        template='plotly_white'
+    )
+    return fig
+
+
+def dcf_histogram(values, price=None, bins=80):
+    """Distribution of DCF values per share as pre-binned bars, so the browser gets `bins` points instead of every scenario"""
+    # The extreme tails would squeeze the bulk of the distribution into a few bars
+    low, high = np.percentile(values, [1, 99])
+    counts, edges = np.histogram(values, bins=bins, range=(low, high))
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts / len(values) * 100,
+        width=np.diff(edges),
+        marker_color='royalblue',
+        name='Scenarios'
+    ))
+    if price:
+        fig.add_vline(x=price, line=dict(color='crimson', dash='dash'), annotation_text=f"Price {price:,.2f}")
+
+    fig.update_layout(
+        title='DCF Value per Share',
+        xaxis_title='Value per Share',
+        yaxis_title='% of Scenarios',
+        bargap=0,
+        template='plotly_white'
+    )
+    return fig
+
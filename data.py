@@ -496,6 +496,16 @@ RATIO_GROUPS = {
         ]
     }
 
+# Valuation of every period at the close on its statement date, shown under the ratio groups
+MULTIPLE_GROUPS = {
+        "Market Value": [
+            "Price", "Market Cap", "Enterprise Value"
+        ],
+        "Valuation Multiples": [
+            "PE Ratio", "P/B Ratio", "EV/EBIT", "EV/FCF", "FCF Yield"
+        ]
+    }
+
 RATIO_EXPLANATIONS = {
     "Net Profit Margin": {
         "formal": "**Net Profit Margin** shows how much net income is generated as a percentage of revenue.",
@@ -581,6 +591,24 @@ RATIO_EXPLANATIONS = {
         "latex": r"Z = 1.2A + 1.4B + 3.3C + 0.6D + 1.0E",
         "guide": "- Z > 3 = safe zone\n- 1.8 < Z < 3 = gray zone\n- Z < 1.8 = high risk"
     },
+    "Price": {
+        "formal": "**Price** is the closing price of the stock on the last trading day on or before the statement date.",
+        "casual": "What the stock cost when the books for this period were closed.",
+        "latex": None,
+        "guide": "- Every multiple in this table is built on this price, not today's.\n- It is the price as it traded that day, neither adjusted for dividends paid since nor for later splits, like the share count it is multiplied by."
+    },
+    "Enterprise Value": {
+        "formal": "**Enterprise Value** is the market cap plus debt minus cash — the price of buying the whole business.",
+        "casual": "What you'd really pay to own the company outright, debts included and cash refunded.",
+        "latex": r"\text{EV} = \text{Market Cap} + \text{Long Term Debt} + \text{Short Term Debt} - \text{Cash}",
+        "guide": "- Compare with Market Cap: a large gap means a lot of debt (or cash).\n- Use EV multiples to compare companies with different debt loads."
+    },
+    "EV/EBIT": {
+        "formal": "**EV/EBIT** compares a company's enterprise value to its earnings before interest and tax.",
+        "casual": "How many periods of operating profit you're paying for the whole business.",
+        "latex": r"\text{EV/EBIT} = \frac{\text{Enterprise Value}}{\text{EBIT}}",
+        "guide": "- < 10 is attractive. > 20 is expensive.\n- Quarterly values use one quarter's EBIT, so they run about 4x the yearly ones."
+    },
     "Inventory Turnover": {
         "formal": "**Inventory Turnover** measures how often inventory is sold and replaced.",
         "casual": "How fast they sell their stuff — or is it just collecting dust?",
@@ -838,4 +866,31 @@ You can save your dashboard as a PDF report by printing the page.
 
 This tool was built to **empower your financial analysis** and make learning metrics **easier and fun**.  
 If you enjoy it or want to contribute new ideas, feel free to fork or expand this project!
-    """
\ No newline at end of file
+    """
+
+DCF_EXPLANATION = {
+    "formal": "**Discounted Cash Flow (DCF)** values a company as the present value of the free cash flow it will generate. Here it is run as a **Monte Carlo simulation**: every scenario draws its own yearly growth, FCF margin and discount rate, so the result is a range of values instead of one number.",
+
+    "casual": "Guess how much cash the company will make, then ask what that cash is worth today. Since nobody knows the future, we guess 100,000 times with slightly different assumptions and look at where most of the guesses land.",
+
+    "latex": r"""
+\begin{aligned}
+\text{FCF}_t &= \text{Revenue}_0 \times \prod_{k=1}^{t} (1 + g_k) \times \text{FCF Margin} \\[1em]
+\text{TV} &= \frac{\text{FCF}_5 \times (1 + g_\infty)}{r - g_\infty} \\[1em]
+\text{Value per Share} &= \frac{\sum_{t=1}^{5} \frac{\text{FCF}_t}{(1 + r)^t} + \frac{\text{TV}}{(1 + r)^5} - \text{Net Debt}}{\text{Shares Outstanding}}
+\end{aligned}
+""",
+
+    "guide": """
+**Interpretation Guide:**
+- **Growth** is drawn around the historical yearly FCF growth, **FCF Margin** around the historical FCF / Revenue.
+- **Median**: the middle of all scenarios — a rough "fair value".
+- **P5 – P95**: 90% of scenarios fall in this range. A wide range means the history is noisy.
+- **Above Price**: the share of scenarios worth more than today's price.
+
+**⚠ Limitations:**
+- Yahoo only provides about four years of statements, so the seeds rest on very little history.
+- The result is very sensitive to the discount rate and terminal growth — try moving them.
+"""
+}
+
@@ -0,0 +1,66 @@
+import numpy as np
+
+# Scenarios per valuation and the years projected before the terminal value
+SCENARIOS = 100_000
+YEARS = 5
+
+# Where the dashboard's discount rate and long-run growth start, and how much the rate varies between scenarios
+DISCOUNT_RATE = 0.09
+DISCOUNT_STD = 0.01
+TERMINAL_GROWTH = 0.025
+
+# One freak year is clipped so it can't dominate the growth seed
+GROWTH_BOUNDS = (-0.3, 0.3)
+
+# Used when the history is too short to measure a spread
+DEFAULT_GROWTH = 0.03
+DEFAULT_GROWTH_STD = 0.05
+DEFAULT_MARGIN_STD = 0.02
+
+
+def seed_assumptions(yfinancials):
+    """Mean and spread of FCF growth and FCF margin, from the yearly history"""
+    fcf = yfinancials["Free Cash Flow"].to_numpy(dtype=float)
+    revenue = yfinancials["Revenue"].to_numpy(dtype=float)
+
+    # A growth rate only means something between two years of positive FCF
+    previous, current = fcf[:-1], fcf[1:]
+    positive = (previous > 0) & (current > 0)
+    growth = np.clip(current[positive] / previous[positive] - 1, *GROWTH_BOUNDS)
+
+    reported = (revenue > 0) & ~np.isnan(fcf)
+    margins = fcf[reported] / revenue[reported]
+    return {
+        "growth_mean": growth.mean() if len(growth) else DEFAULT_GROWTH,
+        "growth_std": growth.std(ddof=1) if len(growth) > 1 else DEFAULT_GROWTH_STD,
+        "margin_mean": margins.mean() if len(margins) else np.nan,
+        "margin_std": margins.std(ddof=1) if len(margins) > 1 else DEFAULT_MARGIN_STD,
+    }
+
+
+def simulate(revenue, assumptions, net_debt, shares, discount_rate=DISCOUNT_RATE, terminal_growth=TERMINAL_GROWTH,
+             scenarios=SCENARIOS, years=YEARS, seed=0):
+    """Value per share of every scenario, all paths computed as one (scenarios, years) array.
+
+    Each path draws a growth rate per year and one FCF margin and discount rate; revenue compounds
+    at the growth, FCF is the margin of it, and the last year's FCF grows at `terminal_growth` forever."""
+    rng = np.random.default_rng(seed)
+    growth = rng.normal(assumptions["growth_mean"], assumptions["growth_std"], (scenarios, years))
+    margin = rng.normal(assumptions["margin_mean"], assumptions["margin_std"], (scenarios, 1))
+    # The terminal value needs every rate above the long-run growth
+    rate = np.maximum(rng.normal(discount_rate, DISCOUNT_STD, (scenarios, 1)), terminal_growth + 0.01)
+
+    fcf = revenue * np.cumprod(1 + growth, axis=1) * margin
+    discount = (1 + rate) ** -np.arange(1, years + 1)
+    terminal = fcf[:, -1] * (1 + terminal_growth) / (rate[:, 0] - terminal_growth)
+    enterprise_value = (fcf * discount).sum(axis=1) + terminal * discount[:, -1]
+    return (enterprise_value - net_debt) / shares
+
+
+def summarize(values, price=None):
+    """Percentiles of a value-per-share distribution and, given a price, the share of scenarios above it"""
+    p5, p50, p95 = np.percentile(values, [5, 50, 95])
+    summary = {"P5": p5, "Median": p50, "P95": p95}
+    if price:
+        summary["Above Price"] = (values > price).mean() * 100
+    return summary
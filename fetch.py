@@ -0,0 +1,163 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from prices import append_bars, period_offset
+from providers import ENDPOINTS, HISTORY_PERIODS
+from ratelimit import (
+    MAX_ATTEMPTS, CircuitOpenError, backoff_delay, get_breaker, get_host_slots, get_rate_limiter, is_retryable
+)
+
+MAX_WORKERS = 4
+
+
+def is_empty(value):
+    if hasattr(value, "empty"):
+        return value.empty
+    return not value
+
+
+def holding(slots, fn):
+    # The process-wide slot is taken on the worker thread, so waiting for one never blocks the event loop
+    def call(*args, **kwargs):
+        with slots:
+            return fn(*args, **kwargs)
+    return call
+
+
+class AsyncFetcher():
+    """Fetches endpoints on one event loop, running the blocking provider calls on threads.
+
+    Every upstream call takes a token from the process-wide rate limiter, holds one of
+    this fetcher's `per_host` slots and one of the host's process-wide ones, and goes
+    through that host's circuit breaker. Calls
+    are retried with jittered exponential backoff on 429, 5xx and dropped connections.
+    While a circuit is open calls fail straight away, or wait for it with
+    `wait_for_breaker`. Providers without a `host` read local data and skip all of that."""
+
+    def __init__(self, provider, per_host=MAX_WORKERS, max_attempts=MAX_ATTEMPTS, wait_for_breaker=False):
+        self.provider = provider
+        self.per_host = per_host
+        self.max_attempts = max_attempts
+        self.wait_for_breaker = wait_for_breaker
+        self.limiter = get_rate_limiter()
+        self.semaphores = {}
+        self.calls = 0
+        self.retries = 0
+
+    async def call(self, fn, *args, **kwargs):
+        host = self.provider.host
+        if host is None:
+            return await asyncio.to_thread(fn, *args, **kwargs)
+
+        breaker = get_breaker(host)
+        semaphore = self.semaphores.setdefault(host, asyncio.Semaphore(self.per_host))
+        slots = get_host_slots(host)
+        attempt = 0
+        while True:
+            wait = breaker.wait_time()
+            if wait > 0:
+                if not self.wait_for_breaker:
+                    raise CircuitOpenError(f"Too many failures from {host}, pausing requests for {wait:.0f}s")
+                await asyncio.sleep(wait)
+                continue
+
+            await asyncio.sleep(self.limiter.reserve())
+            try:
+                async with semaphore:
+                    self.calls += 1
+                    result = await asyncio.to_thread(holding(slots, fn), *args, **kwargs)
+            except Exception as e:
+                if not is_retryable(e):
+                    # The host answered, it just had nothing useful to say
+                    breaker.success()
+                    raise
+                breaker.failure()
+                attempt += 1
+                if attempt >= self.max_attempts:
+                    raise
+                self.retries += 1
+                await asyncio.sleep(backoff_delay(attempt - 1))
+            else:
+                breaker.success()
+                return result
+
+    async def fetch_endpoint(self, ticker, name, cache=None):
+        result = None
+        if cache is not None:
+            result = await asyncio.to_thread(cache.get, ticker, name)
+            if result is None and name in HISTORY_PERIODS:
+                result = await self.refresh_history(ticker, name, cache)
+        if result is None:
+            result = await self.call(self.provider.fetch, ticker, name)
+            # Empty payloads usually mean Yahoo had a bad moment, so they are never cached
+            if cache is not None and not is_empty(result):
+                await asyncio.to_thread(cache.put, ticker, name, result)
+        return result
+
+    async def refresh_history(self, ticker, name, cache):
+        """Tops up an expired cached price history with only the bars since its last one.
+
+        Returns None when there is nothing to top up and the whole period has to be fetched."""
+        stale = await asyncio.to_thread(cache.get_stale, ticker, name)
+        if stale is None or is_empty(stale):
+            return None
+        period = HISTORY_PERIODS[name]
+        new_bars = await self.call(self.provider.history, ticker, period, start=stale.index[-1])
+        result = append_bars(stale, new_bars, period_offset(period))
+        if result is not None:
+            await asyncio.to_thread(cache.put, ticker, name, result)
+        return result
+
+    async def timed_endpoint(self, ticker, name, cache):
+        start = time.perf_counter()
+        try:
+            return await self.fetch_endpoint(ticker, name, cache), None, time.perf_counter() - start
+        except Exception as e:
+            return None, e, time.perf_counter() - start
+
+    async def fetch_ticker(self, ticker, endpoints=ENDPOINTS, cache=None):
+        """Fetches every endpoint of `ticker` at once, returning the results, failures and seconds by endpoint"""
+        outcomes = await asyncio.gather(*(self.timed_endpoint(ticker, name, cache) for name in endpoints))
+        results, failures, timings = {}, {}, {}
+        for name, (result, error, seconds) in zip(endpoints, outcomes):
+            timings[name] = seconds
+            if error is None:
+                results[name] = result
+            else:
+                failures[name] = error
+        return results, failures, timings
+
+
+def run_sync(coro):
+    # The result comes back through `box` rather than the task: on the main thread asyncio.run
+    # reprs the finished task when restoring the SIGINT handler, which is slow for frames
+    box = []
+
+    async def boxed():
+        box.append(await coro)
+
+    # Notebooks already run an event loop on this thread, so the coroutine gets a thread of its own there
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        asyncio.run(boxed())
+    else:
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pool.submit(asyncio.run, boxed()).result()
+    return box[0]
+
+
+def fetch_all(provider, ticker, endpoints=ENDPOINTS, max_workers=MAX_WORKERS, cache=None):
+    """Fetches every endpoint concurrently, at most `max_workers` upstream calls at a time, serving what it can from `cache`.
+
+    Returns the results, the exception of every endpoint that failed and the
+    seconds each endpoint took, all keyed by endpoint name."""
+    fetcher = AsyncFetcher(provider, per_host=max_workers)
+
+    async def fetch():
+        # Providers without a host skip the per-host slots, so the loop's threads are what bounds them
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=max_workers))
+        return await fetcher.fetch_ticker(ticker, endpoints, cache)
+
+    return run_sync(fetch())
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+KEY_COLUMNS = ['Year', 'Quarter']
+
+# Divisor and column suffix for values whose largest magnitude reaches the divisor, largest first
+SCALES = [(1e12, "(Trillions)"), (1e9, "(Billions)"), (1e6, "(Millions)")]
+DIVISORS = np.array([divisor for divisor, _ in SCALES])
+
+
+def split_keys(df, columns=None):
+    keys = [x for x in KEY_COLUMNS if x in df.columns]
+    if columns is None:
+        columns = df.columns
+    return keys, [x for x in columns if x not in keys]
+
+
+def column_matrix(df, columns):
+    # Stacking column arrays skips the block consolidation a df[columns] selection pays for
+    if not columns:
+        return np.empty((len(df), 0))
+    return np.column_stack([df[column].to_numpy(dtype=float, na_value=np.nan) for column in columns])
+
+
+def build_frame(df, keys, columns, values):
+    """Key columns of `df` plus `values` under `columns`, without the rows missing anything"""
+    key_arrays = {key: df[key].to_numpy() for key in keys}
+    keep = ~np.isnan(values).any(axis=1)
+    for array in key_arrays.values():
+        keep &= ~pd.isna(array)
+    data = {key: array[keep] for key, array in key_arrays.items()}
+    data.update(zip(columns, values[keep].T))
+    return pd.DataFrame(data, index=df.index[keep])
+
+
+def scale_df(df, columns=None):
+    """Financials in trillions, billions or millions, picking one scale per column from its largest value.
+
+    `columns` picks the value columns out of a wider frame; the Year and Quarter columns always come along."""
+    keys, columns = split_keys(df, columns)
+    values = column_matrix(df, columns)
+    # fmax skips NaN, so all-NaN columns peak at -inf and stay unscaled
+    peaks = np.fmax.reduce(np.abs(values), axis=0, initial=-np.inf)
+    reached = peaks[:, None] >= DIVISORS
+    picked = reached.argmax(axis=1)
+    scaled = reached.any(axis=1)
+    divisors = np.where(scaled, DIVISORS[picked], 1.0)
+    names = [f"{column} {SCALES[i][1]}" if hit else column for column, i, hit in zip(columns, picked, scaled)]
+    return build_frame(df, keys, names, values / divisors)
+
+
+def round_df(df, columns=None, decimals=2):
+    """Ratios rounded for display, without the rows missing anything"""
+    keys, columns = split_keys(df, columns)
+    values = column_matrix(df, columns)
+    return build_frame(df, keys, columns, values.round(decimals))
+
+
+def frame_size(df):
+    """Bytes a display frame holds, for budgeting the table cache"""
+    return int(df.memory_usage(index=True).sum())
@@ -1,9 +1,16 @@
 import streamlit as st
 from stock import stock  # import your class here
-import pandas as pd
-import matplotlib.pyplot as plt
+from cache import MemoryCache
+from providers import provider_from_env
+from charts import candlestick_figure, group_figure, figure_size, dcf_histogram
+from formatting import scale_df, round_df, frame_size
+from perf import PerfLog
+from prices import RANGES
+from sessions import shared_session_stats
+from overrides import OverrideStore
+from ratios import apply_piotroski_overrides
+from dcf import DISCOUNT_RATE, SCENARIOS, TERMINAL_GROWTH, simulate, summarize
 import seaborn as sns
-import plotly.graph_objects as go
 from data import *
 sns.set(style='dark')
 
@@ -11,41 +18,20 @@ st.set_page_config(page_title="Dashboard", layout="wide")
 
 # Sidebar Inputs
 st.sidebar.title("Options")
-ticker = st.sidebar.text_input("Enter Ticker Symbol", value="MSFT")
-view_mode = st.sidebar.radio("Select Your View Mode", ["Quarterly", 'Yearly'])
+# Normalized once, so every cache, memo and override store sees the same symbol whatever was typed
+ticker = st.sidebar.text_input("Enter Ticker Symbol", value="MSFT").strip().upper()
+view_mode = st.sidebar.radio("Select Your View Mode", ["Quarterly", 'Yearly', 'TTM'],
+                             help="TTM sums each quarter with the three before it, so its ratios compare with the yearly ones")
 dummy_mode = st.sidebar.checkbox("Enable Dummy Mode")
-plot_f = st.sidebar.checkbox("Plot Financial's Graphs")
-plot_r = st.sidebar.checkbox("Plot Ratios' Graphs")
 about_project = st.sidebar.checkbox("Display About Page")
+show_perf = st.sidebar.checkbox("Show Performance Panel")
 
-def scale_df(df):
-        columns = [x for x in df.columns if x not in ['Year', 'Quarter']]
-        new_df = df[['Year', 'Quarter']] if 'Quarter' in df.columns else df[['Year']]
-        for column in columns:
-            max_val = df[column].abs().max()
-            if pd.isna(max_val):
-                scale = 1
-                suffix = ''
-            elif max_val >= 1e12:
-                scale = 1e12
-                suffix = "(Trillions)"
-            elif max_val >= 1e9:
-                scale = 1e9
-                suffix = "(Billions)"
-            elif max_val >= 1e6:
-                scale = 1e6
-                suffix = "(Millions)"
-            else:
-                scale = 1
-                suffix = ''
-            
-            if suffix != '':
-                new_col_name = f"{column} {suffix}"
-                new_df[new_col_name] = (df[column] / scale)
-            else:
-                new_df[column] = df[column]
-            new_df.dropna(inplace = True)
-        return new_df
+# Timings of every stage of this run, shown in the Performance panel
+perf_log = PerfLog(ticker=ticker, view_mode=view_mode)
+
+def plot_chart(fig, name):
+    with perf_log.stage(name, "chart"):
+        st.plotly_chart(fig, use_container_width=True)
 
 def render_metric(col, label, value, formal_explanation, casual_explanation, latex_formula=None, interpretation_note=None):
     """Renders Metrics on the Screen"""
@@ -63,6 +49,7 @@ def render_metric(col, label, value, formal_explanation, casual_explanation, lat
                 st.markdown("🔍 **Interpretation Guide:**")
                 st.markdown(interpretation_note)
 
+@perf_log.timed("render")
 def display_company_header():
     info = stock_obj.info
 
@@ -268,59 +255,25 @@ def display_company_header():
     )
 
 
-    st.subheader(f"📈 Historical Price Chart for {stock_obj.ticker}")
+    display_price_chart()
 
-    if view_mode == 'Yearly':
-        hist_data = stock_obj.ypricehistory
-        report_dates = stock_obj.y_dates
-    else:
-        hist_data = stock_obj.qpricehistory
-        report_dates = stock_obj.q_dates
-
-    fig = go.Figure()
-    fig.add_trace(go.Candlestick(x=hist_data.index,
-                    open=hist_data['Open'],
-                    high=hist_data['High'],
-                    low=hist_data['Low'],
-                    close=hist_data['Close'], name='Price'))
-    
-    for date in report_dates:
-        fig.add_shape(
-            type='line',
-            x0=date,
-            x1=date,
-            y0=hist_data['Low'].min(),
-            y1=hist_data['High'].max(),
-            line=dict(color='royalblue', width=1, dash='dot'),
-            xref='x',
-            yref='y'
-        )
+# Changing the range only reruns the chart, not the metrics above it
+@st.fragment
+@perf_log.timed("render")
+def display_price_chart():
+    st.subheader(f"📈 Historical Price Chart for {stock_obj.ticker}")
 
-    if view_mode == 'Yearly':
-        fig.update_layout(
-            title=f'{stock_obj.info.get("longName", stock_obj.ticker)} Stock Price Over Last 5 Years',
-            yaxis_title=f'Price in {info.get("financialCurrency")}',
-            xaxis_rangeslider_visible=True,
-            hovermode='x unified',
-            template='plotly_dark',
-            height=800,
-            yaxis=dict(
-                fixedrange=False
-            )
-        )
-    else:
-        fig.update_layout(
-            title=f'{stock_obj.info.get("longName", stock_obj.ticker)} Stock Price Over Last Year',
-            yaxis_title=f'Price in {info.get("financialCurrency")}',
-            xaxis_rangeslider_visible=True,
-            hovermode='x unified',
-            template='plotly',
-            height=800,
-            yaxis=dict(
-                fixedrange=False
-            )
-        )
-    st.plotly_chart(fig, use_container_width=True)
+    range_name = st.radio(
+        "Visible Range", list(RANGES),
+        index=list(RANGES).index("Max" if view_mode == 'Yearly' else "2Y"),
+        horizontal=True, key=f"price_range_{view_mode}",
+        help="Longer ranges switch to weekly or monthly candles so the chart stays light; shorter ones show daily candles."
+    )
+    fig = get_figure_cache().get_or_create(
+        (stock_obj.ticker, view_mode, range_name, stock_obj.created_at),
+        lambda: candlestick_figure(stock_obj, view_mode, range_name)
+    )
+    plot_chart(fig, "Price Chart")
     
     if dummy_mode:
         with st.expander("📘 Click here for explanation"):
@@ -331,36 +284,34 @@ def display_company_header():
             st.markdown("🔍 **Interpretation Guide:**")
             st.markdown(HISTORICAL_CHART["guide"])
 
-def display_grouped_financials_q():
+def display_table(kind, group_name, format_df, df, columns):
+    """One group's formatted table, built once per (ticker, group, view mode) and load of the ticker"""
+    return get_table_cache().get_or_create(
+        (stock_obj.ticker, kind, group_name, view_mode, stock_obj.created_at),
+        lambda: format_df(df, columns).reset_index(drop=True)
+    )
+
+@st.fragment
+@perf_log.timed("render")
+def display_grouped_financials_q(financials):
+    plot_f = st.toggle("Plot Financial's Graphs", key="plot_financials")
     for group_name, cols in FINANCIAL_GROUPS_Q.items():
-        available_cols = [col for col in cols if col in stock_obj.qfinancials.columns]
+        available_cols = [col for col in cols if col in financials.columns]
+        # TTM financials have no growth columns
+        if not available_cols:
+            continue
 
         st.subheader(f"📘 {group_name}")
 
-        show_df = scale_df(stock_obj.qfinancials[["Year", "Quarter"] + available_cols])
-        st.dataframe(show_df.reset_index(drop=True))
+        show_df = display_table("financials", group_name, scale_df, financials, available_cols)
+        st.dataframe(show_df)
 
         if plot_f:
             plot_df = show_df.copy()
             plot_df['Quarter_Label'] = plot_df['Year'].astype(str) + ' Q' + plot_df['Quarter'].astype(str)
 
-            fig = go.Figure()
-            for col in plot_df.columns.difference(['Year', 'Quarter', 'Quarter_Label']):
-                fig.add_trace(go.Scatter(
-                    x=plot_df['Quarter_Label'],
-                    y=plot_df[col],
-                    mode='lines+markers',
-                    name=col
-                ))
-
-            fig.update_layout(
-                title=group_name,
-                xaxis_title='Quarter',
-                yaxis_title='Values',
-                hovermode='x unified',
-                template='plotly_white'
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            fig = group_figure(plot_df, group_name, 'Quarter_Label', 'Quarter')
+            plot_chart(fig, group_name)
 
         # Dummy Mode Explanation
         if dummy_mode:
@@ -377,45 +328,25 @@ def display_grouped_financials_q():
                         st.markdown(exp["guide"])
                         st.markdown("---")
 
-def display_grouped_ratios_q():
-    def adjust_ratios(df):
-        columns = [x for x in df.columns if x not in ['Year', 'Quarter']]
-        new_df = df[['Year', 'Quarter']]
-        for column in columns:
-            new_df[column] = df[column].round(2)
-        new_df.dropna(inplace = True)
-        return new_df
-
+@st.fragment
+@perf_log.timed("render")
+def display_grouped_ratios_q(ratios, multiples):
+    plot_r = st.toggle("Plot Ratios' Graphs", key="plot_ratios")
     for group_name, cols in RATIO_GROUPS.items():
-        available_cols = [col for col in cols if col in stock_obj.qratios.columns]
+        available_cols = [col for col in cols if col in ratios.columns]
         if not available_cols:
             continue
 
         st.subheader(f"📘 {group_name}")
-        show_df = adjust_ratios(stock_obj.qratios[["Year", "Quarter"] + available_cols])
-        st.dataframe(show_df.reset_index(drop = True))
+        show_df = display_table("ratios", group_name, round_df, ratios, available_cols)
+        st.dataframe(show_df)
 
         if plot_r:
             plot_df = show_df.copy()
             plot_df['Quarter_Label'] = plot_df['Year'].astype(str) + ' Q' + plot_df['Quarter'].astype(str)
 
-            fig = go.Figure()
-            for col in plot_df.columns.difference(['Year', 'Quarter', 'Quarter_Label']):
-                fig.add_trace(go.Scatter(
-                    x=plot_df['Quarter_Label'],
-                    y=plot_df[col],
-                    mode='lines+markers',
-                    name=col
-                ))
-
-            fig.update_layout(
-                title=group_name,
-                xaxis_title='Quarter',
-                yaxis_title='Values',
-                hovermode='x unified',
-                template='plotly_white'
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            fig = group_figure(plot_df, group_name, 'Quarter_Label', 'Quarter')
+            plot_chart(fig, group_name)
 
         if dummy_mode:
             with st.expander("📘 Explanation of Ratios"):
@@ -431,35 +362,62 @@ def display_grouped_ratios_q():
                         st.markdown(exp["guide"])
                         st.markdown("---")
 
+    display_grouped_multiples(multiples, plot_r, 'Quarter_Label', 'Quarter')
+
+def scale_and_round(df, columns):
+    return round_df(scale_df(df, columns))
+
+def display_grouped_multiples(df, plot_r, x_col, x_label):
+    for group_name, cols in MULTIPLE_GROUPS.items():
+        available_cols = [col for col in cols if col in df.columns]
+        if not available_cols:
+            continue
+
+        st.subheader(f"📘 {group_name}")
+        # Market cap and EV are in dollars, so they are scaled like the financials
+        format_df = scale_and_round if group_name == "Market Value" else round_df
+        show_df = display_table("multiples", group_name, format_df, df, available_cols)
+        st.dataframe(show_df)
+
+        if plot_r:
+            plot_df = show_df.copy()
+            if x_col == 'Quarter_Label':
+                plot_df['Quarter_Label'] = plot_df['Year'].astype(str) + ' Q' + plot_df['Quarter'].astype(str)
+
+            fig = group_figure(plot_df, group_name, x_col, x_label)
+            plot_chart(fig, group_name)
+
+        if dummy_mode:
+            with st.expander("📘 Explanation of Multiples"):
+                for col in available_cols:
+                    exp = RATIO_EXPLANATIONS.get(col) or HEADER_METRIC.get(col)
+                    if exp:
+                        st.markdown(f"### 🔍 {col}")
+                        st.markdown(exp["formal"])
+                        if exp.get("latex"):
+                            st.latex(exp["latex"])
+                        st.markdown(exp["casual"])
+                        st.markdown("🔎 **Interpretation Guide:**")
+                        st.markdown(exp["guide"])
+                        st.markdown("---")
+
+@st.fragment
+@perf_log.timed("render")
 def display_grouped_financials_y():
+    plot_f = st.toggle("Plot Financial's Graphs", key="plot_financials")
     for group_name, cols in FINANCIAL_GROUPS_Y.items():
         available_cols = [col for col in cols if col in stock_obj.yfinancials.columns]
 
         st.subheader(f"📘 {group_name}")
 
-        show_df = scale_df(stock_obj.yfinancials[["Year"] + available_cols])
-        st.dataframe(show_df.reset_index(drop = True))
+        show_df = display_table("financials", group_name, scale_df, stock_obj.yfinancials, available_cols)
+        st.dataframe(show_df)
 
         if plot_f:
             plot_df = show_df.copy()
 
-            fig = go.Figure()
-            for col in plot_df.columns.difference(['Year']):
-                fig.add_trace(go.Scatter(
-                    x=plot_df['Year'],
-                    y=plot_df[col],
-                    mode='lines+markers',
-                    name=col
-                ))
-
-            fig.update_layout(
-                title=group_name,
-                xaxis_title='Years',
-                yaxis_title='Values',
-                hovermode='x unified',
-                template='plotly_white'
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            fig = group_figure(plot_df, group_name, 'Year', 'Years')
+            plot_chart(fig, group_name)
 
         # Dummy Mode Explanation
         if dummy_mode:
@@ -476,44 +434,24 @@ def display_grouped_financials_y():
                         st.markdown(exp["guide"])
                         st.markdown("---")
 
+@st.fragment
+@perf_log.timed("render")
 def display_grouped_ratios_y():
-    def adjust_ratios(df):
-        columns = [x for x in df.columns if x not in ['Year']]
-        new_df = df[['Year']]
-        for column in columns:
-            new_df[column] = df[column].round(2)
-        new_df.dropna(inplace = True)
-        return new_df
-
+    plot_r = st.toggle("Plot Ratios' Graphs", key="plot_ratios")
     for group_name, cols in RATIO_GROUPS.items():
         available_cols = [col for col in cols if col in stock_obj.yratios.columns]
         if not available_cols:
             continue
 
         st.subheader(f"📘 {group_name}")
-        show_df = adjust_ratios(stock_obj.yratios[["Year"] + available_cols])
-        st.dataframe(show_df.reset_index(drop = True))
+        show_df = display_table("ratios", group_name, round_df, stock_obj.yratios, available_cols)
+        st.dataframe(show_df)
 
         if plot_r:
             plot_df = show_df.copy()
 
-            fig = go.Figure()
-            for col in plot_df.columns.difference(['Year']):
-                fig.add_trace(go.Scatter(
-                    x=plot_df['Year'],
-                    y=plot_df[col],
-                    mode='lines+markers',
-                    name=col
-                ))
-
-            fig.update_layout(
-                title=group_name,
-                xaxis_title='Years',
-                yaxis_title='Values',
-                hovermode='x unified',
-                template='plotly_white'
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            fig = group_figure(plot_df, group_name, 'Year', 'Years')
+            plot_chart(fig, group_name)
 
         if dummy_mode:
             with st.expander("📘 Explanation of Ratios"):
@@ -529,9 +467,18 @@ def display_grouped_ratios_y():
                         st.markdown(exp["guide"])
                         st.markdown("---")
 
+    display_grouped_multiples(stock_obj.ymultiples, plot_r, 'Year', 'Years')
+
+@st.fragment
+@perf_log.timed("render")
 def display_dupont_analysis(type):
     if type == 'q':
         latest_data = stock_obj.qratios.iloc[-1]
+    elif type == 't':
+        if stock_obj.tratios.empty:
+            st.info("Not enough consecutive quarters for a trailing-twelve-month DuPont analysis.")
+            return
+        latest_data = stock_obj.tratios.iloc[-1]
     else:
         latest_data = stock_obj.yratios.iloc[-1]
 
@@ -557,17 +504,41 @@ def display_dupont_analysis(type):
             st.markdown("🔍 **Interpretation Guide:**")
             st.markdown(DUPONT_EXPLANATION["guide"])
 
+def reset_overrides(ticker):
+    get_override_store().clear(ticker)
+    st.session_state.pop(f'piotroski_editor_{ticker}', None)
+
+def reset_button(container):
+    container.button("Reset Overrides", key=f"piotroski_reset_{stock_obj.ticker}",
+                     on_click=reset_overrides, args=(stock_obj.ticker,))
+
+# Edits only rerun this section, the rest of the page stays as it is
+@st.fragment
+@perf_log.timed("render")
 def display_piotroski_score():
     st.write("If The Company Issue No New Shares betwen Year in Index and the Previous Year then type 1 Otherwise 0 in the the below table")
-    f_score_y = stock_obj.f_score_y
+    overrides = get_override_store()
+    # Shown before anything is applied, so a bad stored override can always be cleared
+    reset_slot = st.container()
+    has_overrides = bool(overrides.get(stock_obj.ticker))
+    if has_overrides:
+        reset_button(reset_slot)
+
+    # The cached stock is shared with every other session, so overrides are applied to a copy
+    f_score_y = apply_piotroski_overrides(stock_obj.f_score_y, overrides.get(stock_obj.ticker))
     new_shares_issued = st.data_editor(f_score_y["No New Shares Issued"],
-                               key = 'piotroski_editor',
+                               key = f'piotroski_editor_{stock_obj.ticker}',
                                use_container_width= True,
                                disabled=['Year'])
-    
-    f_score_y["No New Shares Issued"] = new_shares_issued.astype(int)
-    score_cols = [col for col in f_score_y.columns if col != "F Score"]
-    f_score_y["F Score"] = f_score_y[score_cols].sum(axis = 1)
+
+    # Only the edited years are saved and rescored
+    new_shares_issued = new_shares_issued.astype(int)
+    changed = new_shares_issued[new_shares_issued != f_score_y["No New Shares Issued"]].to_dict()
+    if changed:
+        overrides.update(stock_obj.ticker, changed)
+        if not has_overrides:
+            reset_button(reset_slot)
+        f_score_y = apply_piotroski_overrides(f_score_y, changed)
 
     st.dataframe(f_score_y)
 
@@ -580,14 +551,148 @@ def display_piotroski_score():
             st.markdown("🔍 **Interpretation Guide:**")
             st.markdown(PIOTROSKI_EXPLANATION["guide"])
 
-def get_data():
-    stock_obj = stock(ticker)
+@st.fragment
+@perf_log.timed("render")
+def display_dcf_valuation():
+    inputs = stock_obj.dcf_inputs()
+    if inputs is None:
+        st.info("Not enough yearly revenue and free cash flow history for a DCF valuation.")
+        return
+
+    col1, col2 = st.columns(2)
+    discount_rate = col1.slider("Discount Rate (%)", 5.0, 15.0, DISCOUNT_RATE * 100, 0.25, key="dcf_discount_rate") / 100
+    terminal_growth = col2.slider("Terminal Growth (%)", 0.0, 4.0, TERMINAL_GROWTH * 100, 0.25, key="dcf_terminal_growth") / 100
+
+    # Every scenario in one broadcast pass, fast enough to rerun on each slider move
+    with perf_log.stage("DCF Simulation", "compute"):
+        values = simulate(inputs["revenue"], inputs["assumptions"], inputs["net_debt"], inputs["shares"],
+                          discount_rate=discount_rate, terminal_growth=terminal_growth)
+    price = stock_obj.info.get("currentPrice")
+    summary = summarize(values, price)
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Median Value", f"{summary['Median']:,.2f}", help="Half of the scenarios are worth more than this, half less.")
+    col2.metric("P5 – P95", f"{summary['P5']:,.0f} – {summary['P95']:,.0f}", help="90% of the scenarios fall in this range.")
+    col3.metric("Current Price", f"{price:,.2f}" if price else "N/A")
+    col4.metric("Scenarios Above Price", f"{summary['Above Price']:.1f}%" if "Above Price" in summary else "N/A")
+
+    plot_chart(dcf_histogram(values, price), "DCF Valuation")
+    assumptions = inputs["assumptions"]
+    st.caption(f"{SCENARIOS:,} scenarios seeded from the yearly history: FCF growth {assumptions['growth_mean']:.1%} ± {assumptions['growth_std']:.1%} a year, "
+               f"FCF margin {assumptions['margin_mean']:.1%} ± {assumptions['margin_std']:.1%}.")
+
+    if dummy_mode:
+        with st.expander("📘 Click here for explanation of the DCF Valuation"):
+            st.markdown(DCF_EXPLANATION["formal"])
+            st.markdown("---")
+            st.latex(DCF_EXPLANATION["latex"])
+            st.markdown("---")
+            st.markdown(DCF_EXPLANATION["casual"])
+            st.markdown("---")
+            st.markdown(DCF_EXPLANATION["guide"])
+
+@st.cache_resource
+def get_override_store():
+    return OverrideStore()
+
+@st.cache_resource
+def get_provider():
+    return provider_from_env()
+
+def load_stock(ticker):
+    stock_obj = stock(ticker, provider=get_provider())
+    if not hasattr(stock_obj, "q_dates"):
+        # Nothing to calculate when the statements couldn't be fetched; stopping also keeps the failure out of the stock cache
+        st.error(f"Could not load data for {ticker}.")
+        for err in stock_obj.errors:
+            st.text(f"- {err}")
+        st.stop()
     stock_obj.calculate_quarterly_ratios()
     stock_obj.calculate_yearly_ratios()
+    stock_obj.calculate_ttm_ratios()
     stock_obj.one_time_ratios()
     stock_obj.piotroski_f_score_yearly()
+    # The cache outlives this run, so only what the dashboard shows is kept
+    stock_obj.compact()
+    return stock_obj
+
+@st.cache_resource
+def get_stock_cache():
+    """One cache of fully computed stocks shared by every session in this process"""
+    return MemoryCache()
+
+@st.cache_resource
+def get_figure_cache():
+    """Finished price charts per (ticker, view mode, load), so reruns don't rebuild them"""
+    return MemoryCache(budget=64 * 1024 * 1024, sizeof=figure_size)
+
+@st.cache_resource
+def get_table_cache():
+    """Scaled and rounded group tables, so reruns and reopened tabs don't rebuild them"""
+    return MemoryCache(budget=64 * 1024 * 1024, sizeof=frame_size)
+
+def get_data():
+    with perf_log.stage("get_data", "load"):
+        stock_obj = get_stock_cache().get_or_create(ticker, lambda: load_stock(ticker))
+    # Fetch and compute timings belong to the run that built the object, which may be an earlier one
+    perf_log.add_stock(stock_obj, cached=stock_obj.created_at < perf_log.started_at)
     return stock_obj
 
+def display_performance_panel():
+    perf_log.log()
+    if not show_perf:
+        return
+
+    with st.sidebar.expander("⏱ Performance", expanded=True):
+        st.caption("Milliseconds per stage. Chart times are included in their section's render time, cached fetch and compute times come from the run that first loaded the ticker.")
+        st.dataframe(perf_log.summary())
+        st.dataframe(perf_log.to_frame(), hide_index=True)
+        stock_stats = get_stock_cache().stats()
+        if stock_stats["entries"]:
+            st.caption(f"Stock cache: {stock_stats['entries']} tickers, {stock_stats['bytes'] / stock_stats['entries'] / 1024:.0f} KB per ticker "
+                       f"({stock_stats['bytes'] / 2**20:.1f} of {stock_stats['budget'] / 2**20:.0f} MB)")
+        http_stats = shared_session_stats()
+        if http_stats:
+            st.caption(f"HTTP: {http_stats['requests']} requests over {http_stats['new_connections']} connections "
+                       f"({http_stats['reuse_rate']:.0%} reused, {http_stats['handshake_seconds'] * 1000:.0f} ms in handshakes)")
+        st.download_button(
+            "Download as JSON", perf_log.to_json(),
+            file_name=f"perf_{ticker}.json", mime="application/json"
+        )
+
+def section_renderers():
+    """Tab label and render function of every section of the current view mode"""
+    if view_mode == 'Quarterly':
+        return {
+            "Financials": lambda: display_grouped_financials_q(stock_obj.qfinancials),
+            "Ratios": lambda: display_grouped_ratios_q(stock_obj.qratios, stock_obj.qmultiples),
+            "DuPont Analysis": lambda: display_dupont_analysis(type = 'q'),
+        }
+    if view_mode == 'TTM':
+        return {
+            "Financials": lambda: display_grouped_financials_q(stock_obj.tfinancials),
+            "Ratios": lambda: display_grouped_ratios_q(stock_obj.tratios, stock_obj.tmultiples),
+            "DuPont Analysis": lambda: display_dupont_analysis(type = 't'),
+        }
+    return {
+        "Financials": display_grouped_financials_y,
+        "Ratios": display_grouped_ratios_y,
+        "DuPont Analysis": lambda: display_dupont_analysis(type = 'y'),
+        "Piotroski F Score": display_piotroski_score,
+        "DCF Valuation": display_dcf_valuation,
+    }
+
+# Switching tabs only reruns this fragment, and only the open tab is computed and sent.
+# Every section is a fragment of its own as well, so its widgets rerun just that section
+@st.fragment
+def display_sections():
+    renderers = section_renderers()
+    tabs = st.tabs(list(renderers), key=f"sections_{view_mode}", on_change="rerun")
+    for tab, render in zip(tabs, renderers.values()):
+        if tab.open:
+            with tab:
+                render()
+
 def about_page():
     st.title("📘 About This Financial Dashboard")
     st.markdown(ABOUT_PAGE)
@@ -599,27 +704,14 @@ def main():
             stock_obj = get_data()
             display_company_header()
 
-            if view_mode == 'Quarterly':
-                st.title("Financials")
-                display_grouped_financials_q()
-                st.title("Ratios")
-                display_grouped_ratios_q()
-                st.title("DuPont Analysis")
-                display_dupont_analysis(type = 'q')
-            elif view_mode == 'Yearly':
-                st.title("Financials")
-                display_grouped_financials_y()
-                st.title("Ratios")
-                display_grouped_ratios_y()
-                st.title("DuPont Analysis")
-                display_dupont_analysis(type = 'y')
-                st.title("Piotroski F Score")
-                display_piotroski_score()
+            display_sections()
 
             if stock_obj.errors:
                 st.warning("⚠️ Some data couldn't be retrieved:")
                 for err in stock_obj.errors:
                     st.text(f"- {err}")
+
+            display_performance_panel()
     else:
         about_page()
         
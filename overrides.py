@@ -0,0 +1,44 @@
+import json
+import os
+import threading
+
+from cache import CACHE_DIR
+
+OVERRIDES_PATH = os.path.join(CACHE_DIR, "piotroski_overrides.json")
+
+
+class OverrideStore():
+    """Values users filled in for Piotroski criteria Yahoo can't supply, by ticker and year.
+
+    Kept in a JSON file so every session and every restart sees the same overrides."""
+
+    def __init__(self, path=OVERRIDES_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.values = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.values = json.load(f)
+
+    def get(self, ticker):
+        """Overrides of one ticker as {year: value}"""
+        with self.lock:
+            return {int(year): value for year, value in self.values.get(ticker, {}).items()}
+
+    def update(self, ticker, overrides):
+        with self.lock:
+            self.values.setdefault(ticker, {}).update({str(year): int(value) for year, value in overrides.items()})
+            self.save()
+
+    def clear(self, ticker):
+        with self.lock:
+            if self.values.pop(ticker, None) is not None:
+                self.save()
+
+    def save(self):
+        # Called with the lock held; the rename keeps readers from ever seeing half a file
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp = f"{self.path}.tmp"
+        with open(temp, "w") as f:
+            json.dump(self.values, f, indent=1)
+        os.replace(temp, self.path)
@@ -0,0 +1,65 @@
+import os
+import time
+
+import streamlit as st
+
+from screener import UNIVERSE_PATH, Screener, build_universe
+
+st.set_page_config(page_title="Screener", layout="wide")
+
+# Metrics filtered on when the page first opens, where the universe has them
+DEFAULT_FILTERS = ["ROE (Y)", "FCF Yield", "Altman Z-Score (Q)", "F Score"]
+
+
+@st.cache_resource
+def load_universe(path, modified_at):
+    # `modified_at` is only part of the cache key, so a rebuilt universe is loaded again
+    return Screener.load(path)
+
+
+st.sidebar.title("Screener")
+if st.sidebar.button("Rebuild From Cached Tickers"):
+    with st.spinner("Computing every cached ticker..."):
+        universe, failed = build_universe()
+        universe.save(UNIVERSE_PATH)
+    if failed:
+        st.sidebar.warning(f"{len(failed)} tickers failed: {', '.join(failed)}")
+
+st.title("🔎 Screener")
+
+if not os.path.exists(UNIVERSE_PATH):
+    st.info("No screener universe yet. Open some tickers in the dashboard and press **Rebuild From Cached Tickers**, "
+            "or run `python screener.py build --file universe.txt`.")
+    st.stop()
+
+screener = load_universe(UNIVERSE_PATH, os.path.getmtime(UNIVERSE_PATH))
+
+# Value bounds, empty boxes leaving that side open
+bounds = {}
+filters = st.sidebar.multiselect("Filter On", screener.columns, default=[col for col in DEFAULT_FILTERS if col in screener.columns])
+for col in filters:
+    low_col, high_col = st.sidebar.columns(2)
+    low = low_col.number_input(f"{col} Min", value=None, format="%.4f")
+    high = high_col.number_input(f"{col} Max", value=None, format="%.4f")
+    if low is not None or high is not None:
+        bounds[col] = (low, high)
+
+# Percentile bounds, e.g. only the top decile by ROE
+percentile_bounds = {}
+for col in st.sidebar.multiselect("Percentile Filter On", screener.columns):
+    low, high = st.sidebar.slider(f"{col} Percentile", 0, 100, (0, 100))
+    percentile_bounds[col] = (low, high)
+
+sort_by = st.sidebar.selectbox("Sort By", screener.columns, index=screener.columns.index(filters[0]) if filters else 0)
+ascending = st.sidebar.checkbox("Ascending")
+limit = st.sidebar.number_input("Show Top", min_value=1, value=100, step=10)
+columns = st.multiselect("Columns", screener.columns, default=list(dict.fromkeys([sort_by] + filters + list(percentile_bounds))))
+
+start = time.perf_counter()
+result = screener.query(bounds, percentile_bounds, sort_by=sort_by, ascending=ascending, limit=int(limit), columns=columns or None)
+elapsed = (time.perf_counter() - start) * 1000
+matched = int(screener.mask(bounds, percentile_bounds).sum())
+
+st.caption(f"{matched} of {len(screener)} tickers match, queried in {elapsed:.2f} ms")
+st.dataframe(result.round(4), use_container_width=True)
+st.download_button("Download CSV", result.to_csv().encode(), file_name="screener.csv", mime="text/csv")
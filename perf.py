@@ -0,0 +1,79 @@
+import functools
+import json
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pandas as pd
+
+logger = logging.getLogger("dashboard.perf")
+
+
+def timed_method(method):
+    """Records how long a `stock` method took in the instance's `compute_timings`"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.compute_timings[method.__name__] = time.perf_counter() - start
+    return wrapper
+
+
+class PerfLog():
+    """Collects the duration of every stage of one dashboard run."""
+
+    def __init__(self, **meta):
+        self.meta = meta
+        self.records = []
+        self.started_at = time.time()
+
+    def add(self, stage, category, seconds, **extra):
+        self.records.append({"stage": stage, "category": category, "ms": seconds * 1000, **extra})
+
+    @contextmanager
+    def stage(self, stage, category, **extra):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, category, time.perf_counter() - start, **extra)
+
+    def timed(self, category):
+        """Decorator timing every call of a function under its own name"""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.stage(fn.__name__, category):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def add_stock(self, stock_obj, cached):
+        for endpoint, seconds in getattr(stock_obj, "fetch_timings", {}).items():
+            self.add(endpoint, "fetch", seconds, cached=cached)
+        for method, seconds in getattr(stock_obj, "compute_timings", {}).items():
+            self.add(method, "compute", seconds, cached=cached)
+
+    def to_frame(self):
+        return pd.DataFrame(self.records, columns=["stage", "category", "ms", "cached"])
+
+    def summary(self):
+        """Total milliseconds per category, slowest first"""
+        df = self.to_frame()
+        return df.groupby("category")["ms"].sum().sort_values(ascending=False)
+
+    def to_dict(self):
+        return {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            **self.meta,
+            "stages": self.records,
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), default=str)
+
+    def log(self):
+        logger.info(self.to_json())
@@ -0,0 +1,105 @@
+import pandas as pd
+
+OHLC_AGGREGATION = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+# Resolutions from finest to coarsest, with the pandas rule that builds each one
+RESOLUTIONS = {"Daily": None, "Weekly": "W-MON", "Monthly": "MS"}
+
+# Most candles sent to the browser for one chart
+MAX_BARS = 600
+
+# Visible range choices for the price chart, None meaning the whole history
+RANGES = {"3M": pd.DateOffset(months=3), "6M": pd.DateOffset(months=6), "1Y": pd.DateOffset(years=1),
+          "2Y": pd.DateOffset(years=2), "5Y": pd.DateOffset(years=5), "Max": None}
+
+# Price history shown next to the quarterly statements
+QUARTERLY_WINDOW = RANGES["2Y"]
+
+
+def period_offset(period):
+    # Yahoo periods like "7y" as an offset, for trimming topped-up histories back to length
+    return pd.DateOffset(years=int(period.rstrip("y")))
+
+
+def trailing_window(hist, offset):
+    """The bars of the last `offset` of `hist`, as a slice that shares its data rather than a copy"""
+    if hist.empty:
+        return hist
+    return hist.iloc[hist.index.searchsorted(hist.index[-1] - offset):]
+
+
+def append_bars(hist, new_bars, window=None):
+    """Appends bars fetched since the end of `hist`, trimmed to the last `window`.
+
+    The last cached bar is replaced, since it may have been taken mid-session. Returns None
+    when a split arrived with the new bars, as Yahoo then re-adjusts every older close, or
+    when the cached bars have other columns, and the whole history has to be fetched again."""
+    if new_bars.empty:
+        return hist
+    if not new_bars.columns.equals(hist.columns):
+        return None
+    if "Stock Splits" in new_bars and new_bars["Stock Splits"].fillna(0).ne(0).any():
+        return None
+    combined = pd.concat([hist.iloc[:hist.index.searchsorted(new_bars.index[0])], new_bars])
+    return combined if window is None else trailing_window(combined, window).copy()
+
+
+def resample_ohlc(hist, rule):
+    # Bars are labelled by the day their period starts, like the daily candles
+    bars = hist.resample(rule, closed="left", label="left").agg(OHLC_AGGREGATION)
+    return bars.dropna(subset=["Close"])
+
+
+def ohlc_pyramid(hist):
+    """Daily bars plus weekly and monthly aggregates of them, keyed by resolution"""
+    daily = hist[list(OHLC_AGGREGATION)]
+    return {name: daily if rule is None else resample_ohlc(daily, rule) for name, rule in RESOLUTIONS.items()}
+
+
+def range_start(pyramid, range_name):
+    # None for the whole history
+    offset = RANGES[range_name]
+    daily = pyramid["Daily"]
+    return None if offset is None or daily.empty else daily.index[-1] - offset
+
+
+def visible_bars(pyramid, range_name, max_bars=MAX_BARS):
+    """Picks the finest resolution that shows `range_name` in at most `max_bars` candles.
+
+    Returns the resolution name and the bars inside the range."""
+    start = range_start(pyramid, range_name)
+    for resolution, bars in pyramid.items():
+        # Levels trimmed by compact_pyramid only serve the ranges they reach back to
+        since = bars.attrs.get("since")
+        if since is not None and (start is None or start < since):
+            continue
+        if start is not None:
+            bars = bars.loc[start:]
+        if len(bars) <= max_bars:
+            break
+    return resolution, bars
+
+
+def compact_pyramid(pyramid, max_bars=MAX_BARS):
+    """Keeps only the bars some range is drawn from, for objects that stay cached a long time.
+
+    A 7 year history is only drawn daily for the last 2 years and never monthly, so the
+    older daily bars and the monthly level are dropped. Trimmed levels note where they
+    start in `attrs["since"]`, which `visible_bars` checks."""
+    starts = {}
+    for range_name in RANGES:
+        resolution, _ = visible_bars(pyramid, range_name, max_bars)
+        start = range_start(pyramid, range_name)
+        if resolution not in starts or start is None or (starts[resolution] is not None and start < starts[resolution]):
+            starts[resolution] = start
+
+    compact = {}
+    for resolution, bars in pyramid.items():
+        if resolution not in starts:
+            continue
+        since = starts[resolution]
+        if since is not None and not bars.empty and since > bars.index[0]:
+            bars = bars.loc[since:].copy()
+            bars.attrs["since"] = since
+        compact[resolution] = bars
+    return compact
@@ -0,0 +1,259 @@
+"""Data providers that `stock` reads statements, info and price history from.
+
+Record real responses once and replay them offline:
+    python -m providers record fixtures/ MSFT AAPL
+    DASHBOARD_FIXTURES=fixtures/ streamlit run main.py
+DASHBOARD_FIXTURES may also be the URL of a server with the same layout, e.g. benchmarks/stub_server.py.
+"""
+import argparse
+import functools
+import io
+import json
+import os
+from urllib.parse import quote, urlparse
+
+import pandas as pd
+import yfinance as yf
+from yfinance.exceptions import YFRateLimitError
+
+from ratelimit import HttpError
+from sessions import get_shared_session
+
+STATEMENTS = [
+    "quarterly_financials", "quarterly_balance_sheet", "quarterly_cashflow",
+    "financials", "balance_sheet", "cashflow"
+]
+# The quarterly view's two years are sliced out of the 7 year download instead of fetched again
+HISTORY_PERIODS = {"history_7y": "7y"}
+ENDPOINTS = STATEMENTS[:3] + ["info"] + STATEMENTS[3:] + list(HISTORY_PERIODS)
+
+
+class Provider():
+    """Interface between `stock` and wherever the raw data comes from."""
+
+    # Whether results may be kept in the on-disk cache; local sources don't need it
+    cacheable = True
+    # Host the data comes from, for rate limiting and retries; None for local sources
+    host = None
+
+    def statement(self, ticker, name):
+        """Returns a statement frame in yfinance layout, one row per line item and one column per period."""
+        raise NotImplementedError
+
+    def info(self, ticker):
+        raise NotImplementedError
+
+    def history(self, ticker, period, start=None):
+        """Returns daily OHLCV bars covering `period`, e.g. "7y", or only those from `start` on when it is given."""
+        raise NotImplementedError
+
+    def fetch(self, ticker, endpoint):
+        if endpoint == "info":
+            return self.info(ticker)
+        if endpoint in HISTORY_PERIODS:
+            return self.history(ticker, HISTORY_PERIODS[endpoint])
+        if endpoint in STATEMENTS:
+            return self.statement(ticker, endpoint)
+        raise KeyError(f"Unknown endpoint '{endpoint}'")
+
+
+def yahoo_errors(method):
+    # yfinance reports throttling with its own exception, retried like any other 429
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        try:
+            return method(*args, **kwargs)
+        except YFRateLimitError as e:
+            raise HttpError(429, str(e)) from e
+    return wrapper
+
+
+class YahooProvider(Provider):
+    """Reads from Yahoo through one pooled session shared by every ticker and thread.
+
+    yfinance sends all requests through a single global session, so the last one handed
+    to it wins; keep to the shared session unless you really need another."""
+
+    host = "finance.yahoo.com"
+
+    def __init__(self, session=None):
+        self.session = session if session is not None else get_shared_session()
+
+    def ticker(self, ticker):
+        return yf.Ticker(ticker, session=self.session)
+
+    @yahoo_errors
+    def statement(self, ticker, name):
+        return getattr(self.ticker(ticker), name)
+
+    @yahoo_errors
+    def info(self, ticker):
+        return self.ticker(ticker).info
+
+    @yahoo_errors
+    def history(self, ticker, period, start=None):
+        # Closes as traded, only adjusted for splits; dividends would shift every past valuation
+        if start is not None:
+            return self.ticker(ticker).history(start=start.strftime("%Y-%m-%d"), auto_adjust=False)
+        return self.ticker(ticker).history(period=period, auto_adjust=False)
+
+
+def fixture_path(root, ticker, endpoint):
+    extension = "json" if endpoint == "info" else "pkl"
+    return os.path.join(root, ticker.upper(), f"{endpoint}.{extension}")
+
+
+def save_fixture(root, ticker, endpoint, value):
+    path = fixture_path(root, ticker, endpoint)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if endpoint == "info":
+        with open(path, "w") as f:
+            json.dump(value, f, indent=1, default=str)
+    else:
+        value.to_pickle(path)
+
+
+def load_fixture(root, ticker, endpoint):
+    path = fixture_path(root, ticker, endpoint)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No recorded {endpoint} for {ticker} in {root}")
+    if endpoint == "info":
+        with open(path) as f:
+            return json.load(f)
+    return pd.read_pickle(path)
+
+
+class RecordingProvider(Provider):
+    """Passes every call through to `inner` and saves the response as a fixture under `root`."""
+
+    # Fixtures must hold real responses, not whatever happens to be cached
+    cacheable = False
+
+    def __init__(self, inner, root):
+        self.inner = inner
+        self.root = root
+        self.host = inner.host
+
+    def record(self, ticker, endpoint, value):
+        save_fixture(self.root, ticker, endpoint, value)
+        return value
+
+    def statement(self, ticker, name):
+        return self.record(ticker, name, self.inner.statement(ticker, name))
+
+    def info(self, ticker):
+        return self.record(ticker, "info", self.inner.info(ticker))
+
+    def history(self, ticker, period, start=None):
+        # Only whole periods are recorded, a top-up would overwrite the fixture with a few bars
+        if start is not None:
+            return self.inner.history(ticker, period, start=start)
+        return self.record(ticker, f"history_{period}", self.inner.history(ticker, period))
+
+
+class ReplayProvider(Provider):
+    """Serves fixtures saved by `RecordingProvider` without touching the network."""
+
+    cacheable = False
+
+    def __init__(self, root):
+        self.root = root
+
+    def statement(self, ticker, name):
+        return load_fixture(self.root, ticker, name)
+
+    def info(self, ticker):
+        return load_fixture(self.root, ticker, "info")
+
+    def history(self, ticker, period, start=None):
+        hist = load_fixture(self.root, ticker, f"history_{period}")
+        return hist if start is None else hist.loc[start:]
+
+    def tickers(self):
+        return sorted(name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name)))
+
+
+class HttpProvider(Provider):
+    """Reads fixtures in the `RecordingProvider` layout from a web server, e.g. a local stub.
+
+    Payloads are pickles, so only point it at servers you trust."""
+
+    # Stubbed responses must not end up in the on-disk cache next to real ones
+    cacheable = False
+
+    def __init__(self, base_url, timeout=30, session=None):
+        self.base_url = base_url.rstrip("/")
+        self.host = urlparse(self.base_url).netloc
+        self.timeout = timeout
+        self.session = session if session is not None else get_shared_session()
+
+    def get(self, ticker, endpoint):
+        path = quote(fixture_path("", ticker, endpoint).replace(os.sep, "/"))
+        response = self.session.get(f"{self.base_url}/{path}", timeout=self.timeout)
+        if response.status_code >= 400:
+            raise HttpError(response.status_code, f"{endpoint} for {ticker}")
+        if endpoint == "info":
+            return json.loads(response.content)
+        return pd.read_pickle(io.BytesIO(response.content))
+
+    def statement(self, ticker, name):
+        return self.get(ticker, name)
+
+    def info(self, ticker):
+        return self.get(ticker, "info")
+
+    def history(self, ticker, period, start=None):
+        hist = self.get(ticker, f"history_{period}")
+        return hist if start is None else hist.loc[start:]
+
+
+class MemoryProvider(Provider):
+    """Serves payloads that were already fetched, keyed by ticker and then endpoint."""
+
+    cacheable = False
+
+    def __init__(self, payloads):
+        self.payloads = payloads
+
+    def statement(self, ticker, name):
+        return self.payloads[ticker][name]
+
+    def info(self, ticker):
+        return self.payloads[ticker]["info"]
+
+    def history(self, ticker, period, start=None):
+        hist = self.payloads[ticker][f"history_{period}"]
+        return hist if start is None else hist.loc[start:]
+
+
+def provider_from_env():
+    """Replays `DASHBOARD_FIXTURES` (a directory or a URL) or records into `DASHBOARD_RECORD` when set, otherwise uses Yahoo."""
+    fixtures = os.environ.get("DASHBOARD_FIXTURES")
+    if fixtures and fixtures.startswith(("http://", "https://")):
+        return HttpProvider(fixtures)
+    if fixtures:
+        return ReplayProvider(fixtures)
+    if os.environ.get("DASHBOARD_RECORD"):
+        return RecordingProvider(YahooProvider(), os.environ["DASHBOARD_RECORD"])
+    return YahooProvider()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record Yahoo responses as replayable fixtures.")
+    parser.add_argument("command", choices=["record"])
+    parser.add_argument("root", help="directory the fixtures are written to")
+    parser.add_argument("tickers", nargs="+")
+    args = parser.parse_args()
+
+    recorder = RecordingProvider(YahooProvider(), args.root)
+    for ticker in args.tickers:
+        for endpoint in ENDPOINTS:
+            try:
+                recorder.fetch(ticker, endpoint)
+            except Exception as e:
+                print(f"{ticker} {endpoint}: {e}")
+        print(f"Recorded {ticker}")
+
+
+if __name__ == "__main__":
+    main()
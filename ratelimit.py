@@ -0,0 +1,165 @@
+import random
+import threading
+import time
+
+from curl_cffi.requests.exceptions import ConnectionError as CurlConnectionError
+from curl_cffi.requests.exceptions import Timeout as CurlTimeout
+
+# Requests per second allowed upstream, and how many may go out back to back
+RATE = 5.0
+BURST = 10
+
+# Retries of a throttled or failing request, waiting a random share of an exponentially growing delay
+MAX_ATTEMPTS = 5
+BASE_DELAY = 0.5
+MAX_DELAY = 30.0
+
+# Consecutive failures that open a host's circuit, and how long it stays open
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 30.0
+
+# Calls in flight to one host at a time, across every fetcher and session in the process
+HOST_SLOTS = 8
+
+# Dropped connections and timeouts, from the standard library and from curl_cffi (which yfinance uses)
+CONNECTION_ERRORS = (ConnectionError, TimeoutError, CurlConnectionError, CurlTimeout)
+
+
+class HttpError(Exception):
+    """An upstream response with a non-success status"""
+
+    def __init__(self, status, message=""):
+        super().__init__(f"HTTP {status}{': ' + message if message else ''}")
+        self.status = status
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+def error_status(e):
+    """The HTTP status behind an exception, if it has one"""
+    status = getattr(e, "status", None)
+    if status is None:
+        status = getattr(getattr(e, "response", None), "status_code", None)
+    return status
+
+
+def is_retryable(e):
+    # Throttling, server errors and dropped connections are worth another try, anything else is not
+    status = error_status(e)
+    if status is not None:
+        return status == 429 or 500 <= status < 600
+    return isinstance(e, CONNECTION_ERRORS)
+
+
+def backoff_delay(attempt, base=BASE_DELAY, cap=MAX_DELAY):
+    """Full jitter: a random wait up to base * 2^attempt, so retrying clients spread out"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class TokenBucket():
+    """Thread-safe token bucket refilling at `rate` tokens per second up to `burst`.
+
+    `reserve` takes a token right away and returns how long the caller must wait
+    before using it, so it works the same from threads and from any event loop."""
+
+    def __init__(self, rate=RATE, burst=BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.waited = 0.0
+
+    def reserve(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            # A negative balance queues the caller behind the tokens already promised
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            self.waited += delay
+            return delay
+
+
+class CircuitBreaker():
+    """Stops calls to a host after `threshold` consecutive failures.
+
+    Once `cooldown` seconds have passed a single probe call is let through;
+    its success closes the circuit again, its failure reopens it."""
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.trips = 0
+        self.lock = threading.Lock()
+
+    def wait_time(self):
+        """Seconds until a call may go through, 0 when it may go now (taking the probe slot if half open)"""
+        with self.lock:
+            if self.opened_at is None:
+                return 0.0
+            remaining = self.opened_at + self.cooldown - time.monotonic()
+            if remaining > 0:
+                return remaining
+            if self.probing:
+                # Someone else is probing, check back shortly
+                return min(1.0, self.cooldown)
+            self.probing = True
+            return 0.0
+
+    def success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.probing or (self.opened_at is None and self.failures >= self.threshold):
+                self.opened_at = time.monotonic()
+                self.trips += 1
+            self.probing = False
+
+    def state(self):
+        with self.lock:
+            if self.opened_at is None:
+                return "closed"
+            return "half-open" if self.probing or time.monotonic() >= self.opened_at + self.cooldown else "open"
+
+
+default_limiter = None
+breakers = {}
+host_slots = {}
+registry_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Returns the process-wide token bucket every upstream request goes through."""
+    global default_limiter
+    with registry_lock:
+        if default_limiter is None:
+            default_limiter = TokenBucket()
+        return default_limiter
+
+
+def get_breaker(host):
+    """Returns the process-wide circuit breaker of `host`."""
+    with registry_lock:
+        if host not in breakers:
+            breakers[host] = CircuitBreaker()
+        return breakers[host]
+
+
+def get_host_slots(host):
+    """Returns the process-wide semaphore bounding the calls in flight to `host`."""
+    with registry_lock:
+        if host not in host_slots:
+            host_slots[host] = threading.BoundedSemaphore(HOST_SLOTS)
+        return host_slots[host]
@@ -0,0 +1,318 @@
+import numpy as np
+import pandas as pd
+
+# Columns the engine builds, in the order the dashboard shows them
+QUARTERLY_FINANCIAL_COLUMNS = [
+    "Revenue", "Net Income", "Gross Profit", "Operating Income",
+    "Total Assets", "Total Liabilities", "Equity", "Current Assets", "Current Liabilities",
+    "Inventory", "Cash", "Receivables", "Invested Capital", "Retained Earnings",
+    "EBIT", "Free Cash Flow", "Operating Cash Flow", "Capital Expenditure", "Working Capital"
+]
+
+YEARLY_FINANCIAL_COLUMNS = [
+    "Revenue", "Net Income", "Gross Profit", "Operating Income",
+    "Total Assets", "Total Liabilities", "Equity", "Current Assets", "Current Liabilities",
+    "Inventory", "Cash", "Receivables", "Invested Capital", "Retained Earnings",
+    "EBIT", "Operating Cash Flow", "Capital Expenditure", "Free Cash Flow", "Working Capital"
+]
+
+# Yearly ratios are only computed when every one of these rows is reported
+YEARLY_REQUIRED_COLUMNS = [
+    "Total Revenue", "Net Income", "Gross Profit", "Operating Income",
+    "Total Assets", "Total Liabilities Net Minority Interest", "Stockholders Equity",
+    "Current Assets", "Current Liabilities", "Operating Cash Flow"
+]
+
+GROWTH_COLUMNS = [ "Revenue", "Net Income", "Gross Profit", "Operating Income", "Operating Cash Flow", "Free Cash Flow", "EBIT" ]
+
+# Flows are summed over the trailing four quarters, balances stay as reported at the quarter's end
+TTM_QUARTERS = 4
+FLOW_COLUMNS = [
+    "Revenue", "Net Income", "Gross Profit", "Operating Income",
+    "EBIT", "Operating Cash Flow", "Capital Expenditure", "Free Cash Flow"
+]
+
+# (financial, statement, yfinance row, default when the row is missing)
+STATEMENT_FIELDS = [
+    ("Revenue", "income", "Total Revenue", np.nan),
+    ("Net Income", "income", "Net Income", np.nan),
+    ("Gross Profit", "income", "Gross Profit", np.nan),
+    ("Operating Income", "income", "Operating Income", np.nan),
+    ("EBIT", "income", "EBIT", np.nan),
+    ("Total Assets", "balance", "Total Assets", np.nan),
+    ("Total Liabilities", "balance", "Total Liabilities Net Minority Interest", np.nan),
+    ("Equity", "balance", "Stockholders Equity", np.nan),
+    ("Current Assets", "balance", "Current Assets", np.nan),
+    ("Current Liabilities", "balance", "Current Liabilities", np.nan),
+    ("Inventory", "balance", "Inventory", np.nan),
+    ("Cash", "balance", "Cash And Cash Equivalents", np.nan),
+    ("Receivables", "balance", "Accounts Receivable", np.nan),
+    ("Invested Capital", "balance", "Invested Capital", np.nan),
+    ("Retained Earnings", "balance", "Retained Earnings", np.nan),
+    ("Operating Cash Flow", "cashflow", "Operating Cash Flow", 0),
+    ("Capital Expenditure", "cashflow", "Capital Expenditure", 0),
+    ("Long Term Debt", "balance", "Long Term Debt", 0),
+    ("Short Term Debt", "balance", "Short Term Debt", 0),
+    ("Shares Outstanding", "balance", "Ordinary Shares Number", np.nan),
+]
+
+# Valuation of every period at the close on its statement date, in the order the dashboard shows them
+MULTIPLE_COLUMNS = [
+    "Price", "Market Cap", "Enterprise Value", "PE Ratio", "P/B Ratio", "EV/EBIT", "EV/FCF", "FCF Yield"
+]
+
+
+def safe_div(num, den):
+    """Divides whole columns, giving NaN wherever the denominator is zero or missing."""
+    out = np.full(np.shape(den), np.nan)
+    np.divide(num, den, out=out, where=den != 0)
+    return out
+
+
+def align_statements(income, balance, cashflow, dates):
+    """Pulls every field the engine needs onto a single date index as float arrays.
+
+    Returns the aligned columns and the yfinance rows that were missing."""
+    statements = {"income": income, "balance": balance, "cashflow": cashflow}
+    aligned = {}
+    missing = []
+    for statement, df in statements.items():
+        fields = [field for field in STATEMENT_FIELDS if field[1] == statement]
+        present = [key for _, _, key, _ in fields if key in df.columns]
+        block = df.reindex(index=dates, columns=present).to_numpy(dtype=float, na_value=np.nan)
+        values = dict(zip(present, block.T))
+        for name, _, key, default in fields:
+            if key in values:
+                aligned[name] = values[key]
+            else:
+                missing.append(key)
+                aligned[name] = np.full(len(dates), default, dtype=float)
+    return aligned, missing
+
+
+def column_arrays(df):
+    """Maps column names to their values as 1-D arrays without boxing each one in a Series."""
+    return dict(zip(df.columns, df.to_numpy(dtype=float).T))
+
+
+def build_financials(aligned, dates, columns):
+    fin = dict(aligned)
+
+    # EBIT falls back to Operating Income whenever it isn't reported
+    fin["EBIT"] = np.where(np.isnan(fin["EBIT"]), fin["Operating Income"], fin["EBIT"])
+    fin["Free Cash Flow"] = fin["Operating Cash Flow"] - fin["Capital Expenditure"]
+    fin["Working Capital"] = fin["Current Assets"] - fin["Current Liabilities"]
+    return pd.DataFrame({col: fin[col] for col in columns}, index=dates)
+
+
+def build_ratios(fin):
+    c = column_arrays(fin)
+    revenue = c["Revenue"]
+    net_income = c["Net Income"]
+    total_assets = c["Total Assets"]
+    equity = c["Equity"]
+    current_liabilities = c["Current Liabilities"]
+
+    ratios = {
+        "Net Profit Margin": safe_div(net_income, revenue) * 100,
+        "Gross Margin": safe_div(c["Gross Profit"], revenue) * 100,
+        "Operating Margin": safe_div(c["Operating Income"], revenue) * 100,
+        "ROA": safe_div(net_income, total_assets) * 100,
+        "ROE": safe_div(net_income, equity) * 100,
+        "Current Ratio": safe_div(c["Current Assets"], current_liabilities),
+        "Quick Ratio": safe_div(c["Current Assets"] - c["Inventory"], current_liabilities),
+        "Cash Ratio": safe_div(c["Cash"], current_liabilities),
+        "Debt-to-Equity": safe_div(c["Total Liabilities"], equity),
+        "Debt Ratio": safe_div(c["Total Liabilities"], total_assets),
+        "Cash Flow Margin": safe_div(c["Operating Cash Flow"], revenue) * 100,
+        "Inventory Turnover": safe_div(revenue, c["Inventory"]),
+        "Asset Turnover": safe_div(revenue, total_assets),
+        "Receivables Turnover": safe_div(revenue, c["Receivables"]),
+        "CapEx Intensity": safe_div(c["Capital Expenditure"], revenue) * 100,
+        "ROCE": safe_div(c["Operating Income"], c["Invested Capital"]) * 100,
+        "FCF Conversion": safe_div(c["Free Cash Flow"], net_income) * 100,
+        "Financial Leverage": safe_div(total_assets, equity),
+    }
+    return pd.DataFrame(ratios, index=fin.index)
+
+
+def ttm_windows(dates):
+    """Whether each date closes a window of four consecutive quarters"""
+    dates = pd.DatetimeIndex(dates)
+    complete = np.zeros(len(dates), dtype=bool)
+    if len(dates) >= TTM_QUARTERS:
+        span = (dates[TTM_QUARTERS - 1:] - dates[:len(dates) - TTM_QUARTERS + 1]).days
+        # Three quarters apart is about 273 days, a skipped filing makes it at least a year
+        complete[TTM_QUARTERS - 1:] = span < 320
+    return complete
+
+
+def ttm_financials(fin, complete):
+    """`fin` with its flow columns summed over each trailing four quarters, NaN where the window isn't complete"""
+    c = column_arrays(fin)
+    sums = np.full((len(fin), len(FLOW_COLUMNS)), np.nan)
+    if len(fin) >= TTM_QUARTERS:
+        flows = np.column_stack([c[col] for col in FLOW_COLUMNS])
+        # Every window at once; a NaN quarter leaves its windows NaN
+        windows = np.lib.stride_tricks.sliding_window_view(flows, TTM_QUARTERS, axis=0)
+        sums[TTM_QUARTERS - 1:] = windows.sum(axis=-1)
+    sums[~complete] = np.nan
+    c.update(zip(FLOW_COLUMNS, sums.T))
+    return pd.DataFrame(c, index=fin.index)
+
+
+def period_closes(history, dates):
+    """The last close on or before each of `dates` as it traded then, NaN for dates before the history starts"""
+    if history is None or history.empty:
+        return np.full(len(dates), np.nan)
+    # Statement dates are naive, Yahoo's bars are in the exchange's time zone
+    index = history.index.tz_localize(None) if history.index.tz is not None else history.index
+    closes = history["Close"].to_numpy(dtype=float)
+    # A backward as-of join over the sorted bars: each date takes the bar at or before it
+    positions = index.searchsorted(pd.DatetimeIndex(dates), side="right") - 1
+    # Yahoo divides older closes by every later split, while the statements report the shares of their own date
+    if "Stock Splits" in history:
+        splits = history["Stock Splits"].to_numpy(dtype=float)
+        ratios = np.where(splits > 0, splits, 1.0)
+        later = np.append(np.cumprod(ratios[::-1])[::-1], 1.0)
+        closes = closes * later[1:]
+    return np.where(positions >= 0, closes[np.maximum(positions, 0)], np.nan)
+
+
+def market_caps(aligned, closes):
+    return closes * aligned["Shares Outstanding"]
+
+
+def valuation_multiples(aligned, fin, closes):
+    """Market cap, enterprise value and the multiples built on them, for every period at once"""
+    c = column_arrays(fin)
+    market_cap = market_caps(aligned, closes)
+    ev = market_cap + aligned["Long Term Debt"] + aligned["Short Term Debt"] - c["Cash"]
+    multiples = {
+        "Price": closes,
+        "Market Cap": market_cap,
+        "Enterprise Value": ev,
+        "PE Ratio": safe_div(market_cap, c["Net Income"]),
+        "P/B Ratio": safe_div(market_cap, c["Equity"]),
+        "EV/EBIT": safe_div(ev, c["EBIT"]),
+        "EV/FCF": safe_div(ev, c["Free Cash Flow"]),
+        "FCF Yield": safe_div(c["Free Cash Flow"], market_cap) * 100,
+    }
+    return pd.DataFrame(multiples, index=fin.index)
+
+
+def altman_z(fin, market_cap):
+    """Altman Z of every period; `market_cap` is one value for all of them or one per period"""
+    c = column_arrays(fin)
+    total_assets = c["Total Assets"]
+    market_cap = np.broadcast_to(np.asarray(np.nan if market_cap is None else market_cap, dtype=float), total_assets.shape)
+    if np.isnan(market_cap).all():
+        return np.full(len(total_assets), np.nan)
+
+    # Components fall back to 0 on a zero denominator, the score is NaN if any input is missing
+    zero_nan = lambda values: np.nan_to_num(values, nan=0.0, posinf=np.inf, neginf=-np.inf)
+    A = zero_nan(safe_div(c["Working Capital"], total_assets))
+    B = zero_nan(safe_div(c["Retained Earnings"], total_assets))
+    C = zero_nan(safe_div(c["EBIT"], total_assets))
+    D = zero_nan(safe_div(market_cap, c["Total Liabilities"]))
+    E = zero_nan(safe_div(c["Revenue"], total_assets))
+    z_score = 1.2 * A + 1.4 * B + 3.3 * C + 0.6 * D + 1.0 * E
+
+    inputs = ["Working Capital", "Total Assets", "Retained Earnings", "EBIT", "Total Liabilities", "Revenue"]
+    reported = np.logical_and.reduce([~np.isnan(c[col]) for col in inputs] + [~np.isnan(market_cap)])
+    return np.where(reported, z_score, np.nan)
+
+
+def growth(values):
+    """Period-over-period change in percent, matching `pct_change(fill_method=None).round(4) * 100`."""
+    previous = np.concatenate(([np.nan], values[:-1]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = values / previous - 1
+    return np.round(change, 4) * 100
+
+
+def add_growth(fin, suffix):
+    values = column_arrays(fin)
+    columns = {
+        f"{col} {suffix}": growth(values[col])
+        for col in GROWTH_COLUMNS if col in values
+    }
+    return pd.concat([fin, pd.DataFrame(columns, index=fin.index)], axis=1)
+
+
+# Piotroski criteria in the order `f_score_y` shows them
+PIOTROSKI_COLUMNS = [
+    "Net Income",
+    "ROA",
+    "Operating Cash Flow",
+    "Operating Cash Flow > Net Income",
+    "Lower Debt/Equity vs Last Year",
+    "Higher Current Ratio vs Last Year",
+    "No New Shares Issued",  # Yahoo doesn't report issuance, the dashboard lets users fill it in
+    "Higher Gross Margin vs Last Year",
+    "Higher Asset Turnover vs Last Year"
+]
+
+def piotroski_scores(financials, ratios):
+    """Scores every year against the year before it, all years at once.
+
+    Both frames are indexed by period date, or by (ticker, date) to score a whole panel
+    of tickers in one pass, e.g. `pd.concat({ticker: obj.yfinancials, ...}, names=["Ticker"])`.
+    The first year of each ticker has nothing to compare with and gets no row. Missing
+    values never earn a point."""
+    if not financials.index.is_monotonic_increasing:
+        financials = financials.sort_index()
+    if not financials.index.equals(ratios.index):
+        ratios = ratios.reindex(financials.index)
+
+    def column(frame, name):
+        if name not in frame.columns:
+            return np.full(len(frame), np.nan)
+        return frame[name].to_numpy(dtype=float, na_value=np.nan)
+
+    values = {name: column(financials, name) for name in ("Net Income", "Operating Cash Flow")}
+    values.update({name: column(ratios, name) for name in ("ROA", "Debt Ratio", "Current Ratio", "Gross Margin", "Asset Turnover")})
+
+    # Row i is compared with row i - 1, which has to belong to the same ticker
+    index = financials.index
+    dates = pd.DatetimeIndex(index.get_level_values(-1))[1:]
+    if isinstance(index, pd.MultiIndex):
+        tickers = index.codes[0]
+        keep = tickers[1:] == tickers[:-1]
+        out_index = pd.MultiIndex.from_arrays(
+            [index.get_level_values(0)[1:][keep], dates[keep].year.astype(np.int64)],
+            names=[index.names[0] or "Ticker", "Year"])
+    else:
+        keep = np.ones(len(dates), dtype=bool)
+        out_index = pd.Index(dates.year.astype(np.int64), name="Year")
+
+    now = {name: col[1:][keep] for name, col in values.items()}
+    before = {name: col[:-1][keep] for name, col in values.items()}
+    criteria = [
+        now["Net Income"] > 0,
+        now["ROA"] > 0,
+        now["Operating Cash Flow"] > 0,
+        now["Operating Cash Flow"] > now["Net Income"],
+        now["Debt Ratio"] < before["Debt Ratio"],
+        now["Current Ratio"] > before["Current Ratio"],
+        np.zeros(len(out_index), dtype=bool),
+        now["Gross Margin"] > before["Gross Margin"],
+        now["Asset Turnover"] > before["Asset Turnover"],
+    ]
+    points = np.column_stack(criteria).astype(np.int64)
+    scores = pd.DataFrame(points, index=out_index, columns=PIOTROSKI_COLUMNS)
+    scores["F Score"] = points.sum(axis=1)
+    return scores
+
+
+def apply_piotroski_overrides(scores, overrides, column="No New Shares Issued"):
+    """Sets `column` for the years in `overrides`, moving only those rows' F Score by the difference."""
+    years = scores.index.intersection(list(overrides))
+    if years.empty:
+        return scores
+    # Both touched columns are widened, so scores stored in a narrower dtype can still take the new values
+    scores = scores.astype({column: np.int64, "F Score": np.int64})
+    new = pd.Series(overrides).reindex(years).astype(np.int64)
+    scores.loc[years, "F Score"] += new - scores.loc[years, column]
+    scores.loc[years, column] = new
+    return scores
@@ -0,0 +1,161 @@
+"""Cross-sectional screener over the latest ratios of many tickers.
+
+Build the universe from every ticker in the disk cache (or a list of them) and save it:
+    python screener.py build
+    python screener.py build --file universe.txt
+The Screener page of the dashboard loads the saved universe.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from batch import FETCH_WORKERS, iter_batch, read_tickers
+from cache import CACHE_DIR, get_default_cache
+
+UNIVERSE_PATH = os.path.join(CACHE_DIR, "screener_universe.npz")
+
+# Columns that describe a period rather than measure anything
+PERIOD_COLUMNS = ["Ticker", "Date", "Year", "Quarter"]
+
+
+def latest_row(df, suffix):
+    # The newest period of one output table, its columns suffixed with the view they came from
+    if df.empty:
+        return {}
+    row = df.iloc[-1].drop(PERIOD_COLUMNS, errors="ignore")
+    return {f"{col} ({suffix})": value for col, value in row.items()}
+
+
+def screener_row(tables):
+    """Flattens one ticker's batch tables into the latest quarterly and yearly ratios, F Score and valuation metrics"""
+    row = tables["valuation"].iloc[0].drop("Ticker").to_dict()
+    row.update(latest_row(tables["quarterly_ratios"], "Q"))
+    row.update(latest_row(tables["yearly_ratios"], "Y"))
+    if not tables["piotroski"].empty:
+        row["F Score"] = tables["piotroski"]["F Score"].iloc[-1]
+    return row
+
+
+class Screener():
+    """Latest metrics of every ticker in one float matrix, one row per ticker and one column per metric.
+
+    The matrix is stored column-major, so every filter, sort and percentile works on
+    a contiguous column at once."""
+
+    def __init__(self, tickers, columns, values):
+        self.tickers = np.asarray(tickers, dtype=object)
+        self.columns = list(columns)
+        self.positions = {col: i for i, col in enumerate(self.columns)}
+        self.values = np.asfortranarray(values, dtype=float).reshape(len(self.tickers), len(self.columns))
+        self.percentile_values = None
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Builds the matrix from a dict of ticker -> {metric: value}"""
+        frame = pd.DataFrame.from_dict(rows, orient="index", dtype=float)
+        return cls(frame.index, frame.columns, frame.to_numpy())
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def column(self, name):
+        return self.values[:, self.positions[name]]
+
+    def percentiles(self):
+        """Share of tickers at or below each value, per column, in percent; NaN where the value is missing"""
+        if self.percentile_values is None:
+            pct = np.full(self.values.shape, np.nan, order="F")
+            for i in range(len(self.columns)):
+                col = self.values[:, i]
+                present = ~np.isnan(col)
+                ranked = np.sort(col[present])
+                if ranked.size:
+                    pct[present, i] = np.searchsorted(ranked, col[present], side="right") / ranked.size * 100
+            self.percentile_values = pct
+        return self.percentile_values
+
+    def mask(self, bounds=None, percentile_bounds=None):
+        """Rows within every (low, high) bound, None leaving that side open.
+
+        `bounds` apply to the values, `percentile_bounds` to their percentiles.
+        Rows missing a bounded metric never match."""
+        limits = [(self.values, name, bound) for name, bound in (bounds or {}).items()]
+        if percentile_bounds:
+            limits += [(self.percentiles(), name, bound) for name, bound in percentile_bounds.items()]
+
+        keep = np.ones(len(self), dtype=bool)
+        for matrix, name, (low, high) in limits:
+            col = matrix[:, self.positions[name]]
+            keep &= ~np.isnan(col)
+            if low is not None:
+                keep &= col >= low
+            if high is not None:
+                keep &= col <= high
+        return keep
+
+    def query(self, bounds=None, percentile_bounds=None, sort_by=None, ascending=False, limit=None, columns=None):
+        """Returns the matching tickers as a frame, sorted by `sort_by` with missing values last"""
+        rows = np.flatnonzero(self.mask(bounds, percentile_bounds))
+        if sort_by is not None:
+            key = self.column(sort_by)[rows]
+            # NaN sorts last either way, so descending order negates the key instead of reversing
+            rows = rows[np.argsort(key if ascending else -key, kind="stable")]
+        if limit is not None:
+            rows = rows[:limit]
+        columns = columns or self.columns
+        return pd.DataFrame(
+            self.values[np.ix_(rows, [self.positions[col] for col in columns])],
+            index=pd.Index(self.tickers[rows], name="Ticker"),
+            columns=columns)
+
+    def to_frame(self):
+        return pd.DataFrame(self.values, index=pd.Index(self.tickers, name="Ticker"), columns=self.columns)
+
+    def save(self, path=UNIVERSE_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez(path, tickers=self.tickers.astype(str), columns=np.array(self.columns, dtype=str), values=self.values)
+
+    @classmethod
+    def load(cls, path=UNIVERSE_PATH):
+        with np.load(path) as data:
+            return cls(data["tickers"], data["columns"], data["values"])
+
+
+def build_universe(tickers=None, **kwargs):
+    """Computes every ticker (all cached tickers by default) and returns the screener and the failures"""
+    if tickers is None:
+        tickers = get_default_cache().tickers()
+    rows, failed = {}, {}
+    for ticker, tables, _, error in iter_batch(tickers, **kwargs):
+        if error is None:
+            rows[ticker] = screener_row(tables)
+        else:
+            failed[ticker] = error
+    return Screener.from_rows(rows), failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the screener universe and save it for the dashboard.")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("tickers", nargs="*", help="tickers to include, every cached ticker by default")
+    parser.add_argument("--file", help="text file with one ticker per line")
+    parser.add_argument("--out", default=UNIVERSE_PATH)
+    parser.add_argument("--fetch-workers", type=int, default=FETCH_WORKERS)
+    args = parser.parse_args()
+
+    tickers = read_tickers(args)
+    start = time.perf_counter()
+    screener, failed = build_universe(tickers or None, fetch_workers=args.fetch_workers)
+    screener.save(args.out)
+    for ticker, error in failed.items():
+        print(f"{ticker} FAILED ({error})", file=sys.stderr)
+    print(f"Saved {len(screener)} tickers x {len(screener.columns)} metrics to {args.out} "
+          f"in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
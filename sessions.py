@@ -0,0 +1,65 @@
+import threading
+
+from curl_cffi import CurlInfo
+from curl_cffi import requests as curl_requests
+
+# Connection details curl reports with every response
+CONNECTION_INFOS = [CurlInfo.NUM_CONNECTS, CurlInfo.CONNECT_TIME, CurlInfo.APPCONNECT_TIME]
+
+
+class PooledSession(curl_requests.Session):
+    """Keep-alive curl_cffi session that counts how many requests reused an open connection.
+
+    Share one across every ticker and thread: curl keeps a connection pool per thread,
+    so each worker thread pays for its TCP and TLS handshakes once and reuses them after."""
+
+    def __init__(self, **kwargs):
+        # Yahoo only answers clients that look like a browser, as with yfinance's own sessions
+        kwargs.setdefault("impersonate", "chrome")
+        kwargs.setdefault("curl_infos", CONNECTION_INFOS)
+        super().__init__(**kwargs)
+        self.stats_lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.handshake_seconds = 0.0
+
+    def request(self, *args, **kwargs):
+        response = super().request(*args, **kwargs)
+        infos = getattr(response, "infos", None) or {}
+        connects = infos.get(CurlInfo.NUM_CONNECTS, 0)
+        with self.stats_lock:
+            self.requests += 1
+            self.new_connections += connects
+            if connects:
+                # APPCONNECT_TIME covers TCP and TLS; plain HTTP only has CONNECT_TIME
+                self.handshake_seconds += infos.get(CurlInfo.APPCONNECT_TIME) or infos.get(CurlInfo.CONNECT_TIME, 0.0)
+        return response
+
+    def stats(self):
+        with self.stats_lock:
+            reused = max(self.requests - self.new_connections, 0)
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused": reused,
+                "reuse_rate": reused / self.requests if self.requests else 0.0,
+                "handshake_seconds": self.handshake_seconds,
+            }
+
+
+shared_session = None
+shared_session_lock = threading.Lock()
+
+
+def get_shared_session():
+    """Returns the process-wide pooled session, creating it on first use."""
+    global shared_session
+    with shared_session_lock:
+        if shared_session is None:
+            shared_session = PooledSession()
+        return shared_session
+
+
+def shared_session_stats():
+    """Connection reuse of the shared session, or None while nothing has used it"""
+    return shared_session.stats() if shared_session is not None else None
@@ -1,28 +1,168 @@
-import yfinance as yf
+import pickle
+import time
 import numpy as np
 import pandas as pd
+from cache import fingerprint, get_default_cache
+from dcf import seed_assumptions
+from fetch import MAX_WORKERS, fetch_all
+from perf import timed_method
+from prices import OHLC_AGGREGATION, QUARTERLY_WINDOW, compact_pyramid, ohlc_pyramid, trailing_window
+from providers import YahooProvider
+from ratios import (
+    QUARTERLY_FINANCIAL_COLUMNS, YEARLY_FINANCIAL_COLUMNS, YEARLY_REQUIRED_COLUMNS,
+    align_statements, build_financials, build_ratios, altman_z, add_growth, piotroski_scores,
+    market_caps, period_closes, valuation_multiples, ttm_financials, ttm_windows
+)
+
+# One-time valuation metrics by the label the dashboard shows them under, and the attribute holding each
+ONE_TIME_METRICS = {
+    "PEG Ratio": "peg_ratio",
+    "P/B Ratio": "pb_ratio",
+    "EV/FCF": "ev_fcf",
+    "FCF Yield": "fcf_yield",
+    "EV/EBITDA": "ev_ebit",
+    "Dividend Payout Ratio": "dividend_payout_ratio",
+}
+
+# Raw statements, only needed until the derived frames are calculated
+STATEMENTS = (
+    "q_income_stmt", "q_balance_sheet", "q_cashflow_stmt",
+    "y_income_stmt", "y_balance_sheet", "y_cashflow_stmt",
+)
+
+# Endpoints each set of derived frames is calculated from
+QUARTERLY_ENDPOINTS = ("quarterly_financials", "quarterly_balance_sheet", "quarterly_cashflow")
+YEARLY_ENDPOINTS = ("financials", "balance_sheet", "cashflow")
+
+# Part of every derived frame fingerprint; bump it when the engine's output changes so memoized frames are recomputed
+DERIVED_VERSION = 2
+
+# Frames the dashboard shows, and the dtypes their key columns fit in
+DERIVED_FRAMES = (
+    "qfinancials", "qratios", "qmultiples", "yfinancials", "yratios", "ymultiples",
+    "tfinancials", "tratios", "tmultiples", "f_score_y",
+)
+KEY_DTYPES = {"Year": np.int16, "Quarter": np.int8}
+
+
+def compact_frame(df):
+    """`df` with float32 values and small integer keys"""
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if col in KEY_DTYPES:
+            columns[col] = values.to_numpy().astype(KEY_DTYPES[col])
+        elif pd.api.types.is_float_dtype(values):
+            columns[col] = values.to_numpy(dtype=np.float32)
+        else:
+            # Other integer columns keep their width; Piotroski overrides add int64 values to them
+            columns[col] = values.to_numpy()
+    return pd.DataFrame(columns, index=df.index)
+
+
+PERCENT_COLUMNS = [
+    "Net Profit Margin", "Gross Margin", "Operating Margin",
+    "ROA", "ROE", "Cash Flow Margin", "CapEx Intensity",
+    "FCF Conversion"
+]
+
+RATIO_COLUMNS = [
+    "Current Ratio", "Quick Ratio", "Cash Ratio",
+    "Debt-to-Equity", "Debt Ratio", "Inventory Turnover",
+    "Asset Turnover", "Receivables Turnover",
+    "ROCE", "Altman Z-Score", "PEG Ratio", "Price-to-Book"
+]
+
+RATIO_DECIMALS = {col: 5 for col in PERCENT_COLUMNS}
+RATIO_DECIMALS.update({col: 4 for col in RATIO_COLUMNS})
+
+
+def round_ratios(df):
+    # Rebuilding the frame once is far cheaper than rounding it column by column
+    return pd.DataFrame({
+        col: np.round(df[col].to_numpy(), RATIO_DECIMALS[col]) if col in RATIO_DECIMALS else df[col].to_numpy()
+        for col in df.columns
+    }, index=df.index)
+
+
+def period_keys(dates, quarterly):
+    """Quarter and Year columns of `dates`, the first columns of every derived frame"""
+    keys = pd.DataFrame(index=dates)
+    if quarterly:
+        keys['Quarter'] = ((dates.month - 1) // 3 + 1).to_numpy().astype(np.int64)
+    keys['Year'] = dates.year.to_numpy().astype(np.int64)
+    return keys
+
+
+def trim_rows(df, dates, growth_suffix=None):
+    """Rows of `df` on `dates`; with `growth_suffix` the first one's growth columns are cleared, as in a full calculation"""
+    df = df[df.index.isin(dates)]
+    if growth_suffix is not None and len(df):
+        df = df.copy()
+        growth = df.columns.get_indexer([col for col in df.columns if col.endswith(f" {growth_suffix}")])
+        df.iloc[0, growth] = np.nan
+    return df
+
 
 class stock():
-    def __init__(self, ticker):
+    # No per-instance __dict__, which adds up over thousands of cached tickers
+    __slots__ = (
+        "ticker", "provider", "created_at", "errors", "compute_timings", "fetch_timings", "compacted", "memo", "fingerprints",
+        "info", *STATEMENTS, "ypricehistory", "qpricehistory", "ohlc_levels",
+        "q_dates", "y_dates", "latest_quarter", "latest_year",
+        "qfinancials", "qratios", "qmultiples", "yfinancials", "yratios", "ymultiples",
+        "tfinancials", "tratios", "tmultiples", "f_score_y",
+        "peg_ratio", "pb_ratio", "ev_ebit", "dividend_payout_ratio", "ev_fcf", "fcf_yield",
+    )
+
+    def __init__(self, ticker, provider=None, max_workers=MAX_WORKERS, cache=True, session=None, memo=None):
         # Intilializing Data Points
         self.ticker = ticker
-        self.stock = yf.Ticker(self.ticker)
+        self.provider = provider if provider is not None else YahooProvider(session=session)
+        self.created_at = time.time()
 
         self.errors = []
-        
+        self.compute_timings = {}
+        self.ohlc_levels = None
+        self.compacted = False
+        if not self.provider.cacheable:
+            cache = None
+        elif cache is True:
+            cache = get_default_cache()
+        elif cache is False:
+            cache = None
+        # Derived frames are memoized in the payload cache unless told otherwise
+        if memo is None:
+            memo = cache
+        elif memo is True:
+            memo = get_default_cache()
+        elif memo is False:
+            memo = None
+        self.memo = memo
+
+        # Fetching every endpoint concurrently, keeping each failure instead of stopping at the first
+        results, failures, self.fetch_timings = fetch_all(self.provider, ticker, max_workers=max_workers, cache=cache)
+        for endpoint, e in failures.items():
+            self.errors.append(f"Failed to fetch {endpoint} data for {ticker}. Error: {e}")
+        if failures:
+            return
+
         try:
-            self.q_income_stmt = self.stock.quarterly_financials.T.sort_index()
-            self.q_balance_sheet = self.stock.quarterly_balance_sheet.T.sort_index()
-            self.q_cashflow_stmt = self.stock.quarterly_cashflow.T.sort_index()
-            self.info = self.stock.info
+            # What every endpoint held, so derived frames are only recalculated when it changes
+            self.fingerprints = {name: fingerprint(results[name]) for name in QUARTERLY_ENDPOINTS + YEARLY_ENDPOINTS}
+
+            self.q_income_stmt = results["quarterly_financials"].T.sort_index()
+            self.q_balance_sheet = results["quarterly_balance_sheet"].T.sort_index()
+            self.q_cashflow_stmt = results["quarterly_cashflow"].T.sort_index()
+            self.info = results["info"]
 
             # Getting yearly Data from yfinance
-            self.y_income_stmt = self.stock.financials.T.sort_index()
-            self.y_balance_sheet = self.stock.balance_sheet.T.sort_index()
-            self.y_cashflow_stmt = self.stock.cashflow.T.sort_index()
+            self.y_income_stmt = results["financials"].T.sort_index()
+            self.y_balance_sheet = results["balance_sheet"].T.sort_index()
+            self.y_cashflow_stmt = results["cashflow"].T.sort_index()
 
-            self.ypricehistory = self.stock.history(period="7y")
-            self.qpricehistory = self.stock.history(period="2y")
+            self.ypricehistory = results["history_7y"]
+            self.qpricehistory = trailing_window(self.ypricehistory, QUARTERLY_WINDOW)
 
             if self.info.get('longName') is None:
                  self.errors.append(f"Could not retrieve company information for ticker '{ticker}'. It may be an invalid ticker.")
@@ -35,20 +175,128 @@ class stock():
         # Calculating Some Basic Things
         self.q_dates = self.q_income_stmt.index.intersection(self.q_balance_sheet.index).intersection(self.q_cashflow_stmt.index)
         self.y_dates = self.y_income_stmt.index.intersection(self.y_balance_sheet.index).intersection(self.y_cashflow_stmt.index)
-        self.qratios = pd.DataFrame(index=self.q_dates)
-        self.qfinancials = pd.DataFrame(index=self.q_dates)
-        self.qratios['Quarter'] = self.q_dates.to_series().apply(lambda x:((x.month - 1) // 3) + 1)
-        self.qratios['Year'] = self.q_dates.to_series().apply(lambda x:x.year)
-        self.qfinancials['Quarter'] = self.q_dates.to_series().apply(lambda x:((x.month - 1) // 3) + 1)
-        self.qfinancials['Year'] = self.q_dates.to_series().apply(lambda x:x.year)
-        self.yratios = pd.DataFrame(index=self.y_dates)
-        self.yfinancials = pd.DataFrame(index=self.y_dates)
-        self.yfinancials['Year'] = self.y_dates.to_series().apply(lambda x: x.year)
-        self.yratios['Year'] = self.y_dates.to_series().apply(lambda x: x.year)
+        self.qratios = period_keys(self.q_dates, quarterly=True)
+        self.qfinancials = period_keys(self.q_dates, quarterly=True)
+        self.yratios = period_keys(self.y_dates, quarterly=False)
+        self.yfinancials = period_keys(self.y_dates, quarterly=False)
+        self.qmultiples = period_keys(self.q_dates, quarterly=True)
+        self.ymultiples = period_keys(self.y_dates, quarterly=False)
+        self.tfinancials = period_keys(self.q_dates, quarterly=True)
+        self.tratios = period_keys(self.q_dates, quarterly=True)
+        self.tmultiples = period_keys(self.q_dates, quarterly=True)
         
         self.latest_quarter = self.q_dates[-1]
         self.latest_year = self.y_dates[-1]
     
+    def price_levels(self):
+        """Daily, weekly and monthly OHLC bars of the long price history, built on first use"""
+        if self.ohlc_levels is None:
+            self.ohlc_levels = ohlc_pyramid(self.ypricehistory)
+        return self.ohlc_levels
+
+    def memory_usage(self):
+        """Approximate bytes held by this object's frames, indexes and info."""
+        total = 0
+        for name in self.__slots__:
+            # qpricehistory is a slice sharing the data of the longer history
+            if name == "qpricehistory":
+                continue
+            value = getattr(self, name, None)
+            if name == "ohlc_levels" and value is not None:
+                # Until compact() the daily level is a column selection sharing ypricehistory's data
+                shared = "Daily" if getattr(self, "ypricehistory", None) is not None else None
+                total += sum(int(bars.memory_usage(deep=True).sum()) for level, bars in value.items() if level != shared)
+            elif isinstance(value, pd.DataFrame):
+                total += int(value.memory_usage(deep=True).sum())
+            elif isinstance(value, (pd.Series, pd.Index)):
+                total += int(value.memory_usage(deep=True))
+            elif isinstance(value, (dict, list)):
+                total += len(pickle.dumps(value))
+        return total
+
+    def compact(self):
+        """Shrinks this object for long-lived caches, once every metric has been calculated.
+
+        Derived frames are stored as float32 with small integer Year and Quarter columns,
+        the raw statements are dropped, and prices are kept only as the candles the chart can show."""
+        if self.compacted:
+            return
+        for name in DERIVED_FRAMES:
+            frame = getattr(self, name, None)
+            if frame is not None:
+                setattr(self, name, compact_frame(frame))
+        for name in STATEMENTS:
+            setattr(self, name, None)
+
+        hist = getattr(self, "ypricehistory", None)
+        if hist is not None:
+            # Splits are already folded into the prices, dividends aren't charted
+            bars = hist[list(OHLC_AGGREGATION)].astype(np.float32)
+            self.ohlc_levels = compact_pyramid(ohlc_pyramid(bars))
+            self.qpricehistory = trailing_window(self.ohlc_levels["Daily"], QUARTERLY_WINDOW)
+            self.ypricehistory = None
+
+        # The same warning is often raised once per date
+        self.errors = list(dict.fromkeys(self.errors))
+        self.compacted = True
+
+    def derived_key(self, endpoints, *extra):
+        return fingerprint(DERIVED_VERSION, *(self.fingerprints[name] for name in endpoints), *extra)
+
+    def rows_key(self, statements, dates, closes):
+        # The statements' columns, and one hash per date of only the statement rows and close its derived rows read
+        rows = [pd.util.hash_pandas_object(statement.reindex(dates), index=True).to_numpy() for statement in statements]
+        rows.append(np.asarray(closes, dtype=np.float64).view(np.uint64))
+        return {
+            "version": DERIVED_VERSION,
+            "columns": fingerprint(*(list(statement.columns) for statement in statements)),
+            "rows": np.column_stack(rows),
+        }
+
+    def memoized(self, endpoint):
+        return self.memo.get(self.ticker, endpoint) if self.memo is not None else None
+
+    def restore(self, entry):
+        for name, value in entry["frames"].items():
+            setattr(self, name, value)
+        self.errors.extend(entry["errors"])
+
+    def reuse(self, endpoint, key):
+        """Restores the frames memoized under `endpoint` if their inputs had the fingerprint `key`, returning whether it did"""
+        entry = self.memoized(endpoint)
+        if entry is None or entry["fingerprint"] != key:
+            return False
+        self.restore(entry)
+        return True
+
+    def remember(self, endpoint, key, names, errors=(), statements=None, dates=None, closes=None, **extra):
+        """Memoizes the frames `names` under `key`; with `statements` also the rows of `dates`, so they can be extended later"""
+        if self.memo is not None:
+            if statements is not None:
+                extra.update(dates=dates, rows_key=self.rows_key(statements, dates, closes))
+            frames = {name: getattr(self, name) for name in names}
+            self.memo.put(self.ticker, endpoint, {"fingerprint": key, "frames": frames, "errors": list(errors), **extra})
+
+    def rolled_dates(self, entry, statements, dates, closes):
+        """The memoized dates still in `dates` and the ones filed since (possibly none), or None when the memoized rows can't be reused.
+
+        Yahoo serves a rolling window of periods, so the oldest memoized ones may have fallen off; the rest
+        must lead `dates`, with exactly the statement values and closes they were calculated from."""
+        old = entry.get("dates") if entry is not None else None
+        stored = entry.get("rows_key") if entry is not None else None
+        if old is None or len(old) == 0 or len(dates) == 0 or not isinstance(stored, dict) \
+                or stored["version"] != DERIVED_VERSION:
+            return None
+        start = old.searchsorted(dates[0])
+        kept = old[start:]
+        if len(kept) == 0 or len(dates) < len(kept) or not dates[:len(kept)].equals(kept):
+            return None
+        # Yahoo can restate older bars, e.g. when it corrects a split
+        key = self.rows_key(statements, kept, closes[:len(kept)])
+        if key["columns"] != stored["columns"] or not np.array_equal(key["rows"], stored["rows"][start:]):
+            return None
+        return kept, dates[len(kept):]
+
     def get_safe_value(self, df, key, date, default=np.nan):
         series = df.get(key)
         if series is None:
@@ -56,194 +304,174 @@ class stock():
             return default
         return series.get(date, default)
 
+    def get_safe_columns(self, statements, dates, required=()):
+        aligned, missing = align_statements(*statements, dates)
+        for key in missing:
+            if key in required:
+                raise KeyError(key)
+            self.errors.append(f"Warning: Data column '{key}' not found for {self.ticker}.")
+        return aligned
+
+    @timed_method
     def calculate_quarterly_ratios(self):
         if self.q_dates.empty:
             self.errors.append(f"No quarterly data available for {self.ticker} to calculate ratios.")
             return
-        
-        for date in self.q_dates:
-            try:
-                # Calculating Financials
-                revenue = self.get_safe_value(self.q_income_stmt, "Total Revenue", date, default=np.nan)
-                net_income = self.get_safe_value(self.q_income_stmt, "Net Income", date, default=np.nan)
-                gross_profit = self.get_safe_value(self.q_income_stmt, "Gross Profit", date, default=np.nan)
-                operating_income = self.get_safe_value(self.q_income_stmt, "Operating Income", date, default=np.nan)
-                total_assets = self.get_safe_value(self.q_balance_sheet, "Total Assets", date, default=np.nan)
-                total_liabilities = self.get_safe_value(self.q_balance_sheet, "Total Liabilities Net Minority Interest", date, default=np.nan)
-                equity = self.get_safe_value(self.q_balance_sheet, "Stockholders Equity", date, default=np.nan)
-                current_assets = self.get_safe_value(self.q_balance_sheet, "Current Assets", date, default=np.nan)
-                current_liabilities = self.get_safe_value(self.q_balance_sheet, "Current Liabilities", date, default=np.nan)
-                                
-                inventory = self.get_safe_value(self.q_balance_sheet, "Inventory", date, default=np.nan)
-                cash = self.get_safe_value(self.q_balance_sheet, "Cash And Cash Equivalents", date, default=np.nan)
-                receivables = self.get_safe_value(self.q_balance_sheet, "Accounts Receivable", date, default=np.nan)
-                invested_capital = self.get_safe_value(self.q_balance_sheet, "Invested Capital", date, default=np.nan)
-                retained_earnings = self.get_safe_value(self.q_balance_sheet, "Retained Earnings", date, default=np.nan)
-                ebit = self.get_safe_value(self.q_income_stmt, "EBIT", date, default=np.nan)
-                if pd.isna(ebit):
-                    ebit = self.get_safe_value(self.q_income_stmt, "Operating Income", date, default=np.nan)
-                market_cap = self.info.get("marketCap")
-                
-
-                op_cashflow = self.get_safe_value(self.q_cashflow_stmt, "Operating Cash Flow", date, default=0)
-                capex = self.get_safe_value(self.q_cashflow_stmt, "Capital Expenditure", date, default=0)
-                free_cash_flow = op_cashflow - capex if pd.notnull(op_cashflow) else np.nan
-                working_capital = current_assets - current_liabilities
-
-                # Storing the above Financials
-                self.qfinancials.loc[date, "Revenue"] = revenue
-                self.qfinancials.loc[date, "Net Income"] = net_income
-                self.qfinancials.loc[date, "Gross Profit"] = gross_profit
-                self.qfinancials.loc[date, "Operating Income"] = operating_income
-
-                self.qfinancials.loc[date, "Total Assets"] = total_assets
-                self.qfinancials.loc[date, "Total Liabilities"] = total_liabilities
-                self.qfinancials.loc[date, "Equity"] = equity
-                self.qfinancials.loc[date, "Current Assets"] = current_assets
-                self.qfinancials.loc[date, "Current Liabilities"] = current_liabilities
-                self.qfinancials.loc[date, "Inventory"] = inventory
-                self.qfinancials.loc[date, "Cash"] = cash
-                self.qfinancials.loc[date, "Receivables"] = receivables
-                self.qfinancials.loc[date, "Invested Capital"] = invested_capital
-                self.qfinancials.loc[date, "Retained Earnings"] = retained_earnings
-                self.qfinancials.loc[date, "EBIT"] = ebit
-                self.qfinancials.loc[date, "Free Cash Flow"] = free_cash_flow
-
-                self.qfinancials.loc[date, "Operating Cash Flow"] = op_cashflow
-                self.qfinancials.loc[date, "Capital Expenditure"] = capex
-                self.qfinancials.loc[date, "Free Cash Flow"] = free_cash_flow
-                self.qfinancials.loc[date, "Working Capital"] = working_capital
-
-                # Calculating and storing Financials
-                self.qratios.loc[date, "Net Profit Margin"] =( net_income / revenue) * 100 if revenue else np.nan
-                self.qratios.loc[date, "Gross Margin"] = (gross_profit / revenue) * 100 if revenue else np.nan
-                self.qratios.loc[date, "Operating Margin"] = (operating_income / revenue) * 100 if revenue else np.nan
-                self.qratios.loc[date, "ROA"] = (net_income / total_assets) * 100 if total_assets else np.nan
-                self.qratios.loc[date, "ROE"] = (net_income / equity) * 100 if equity else np.nan
-                self.qratios.loc[date, "Current Ratio"] = current_assets / current_liabilities if current_liabilities else np.nan
-                self.qratios.loc[date, "Quick Ratio"] = (current_assets - inventory) / current_liabilities if current_liabilities else np.nan
-                self.qratios.loc[date, "Cash Ratio"] = cash / current_liabilities if current_liabilities else np.nan
-                self.qratios.loc[date, "Debt-to-Equity"] = total_liabilities / equity if equity else np.nan
-                self.qratios.loc[date, "Debt Ratio"] = total_liabilities / total_assets if total_assets else np.nan
-                self.qratios.loc[date, "Cash Flow Margin"] = (op_cashflow / revenue) * 100 if revenue else np.nan
-                self.qratios.loc[date, "Inventory Turnover"] = revenue / inventory if inventory else np.nan
-                self.qratios.loc[date, "Asset Turnover"] = revenue / total_assets if total_assets else np.nan
-                self.qratios.loc[date, "Receivables Turnover"] = revenue / receivables if receivables else np.nan
-                self.qratios.loc[date, "CapEx Intensity"] = (capex / revenue) * 100 if revenue else np.nan
-                self.qratios.loc[date, "ROCE"] = (operating_income / invested_capital) * 100 if invested_capital else np.nan
-                self.qratios.loc[date, "FCF Conversion"] = (free_cash_flow / net_income) * 100 if net_income else np.nan
-                self.qratios.loc[date, 'Financial Leverage'] = total_assets / equity if equity else np.nan
-
-                # Altman-Z Score
-                if all(pd.notnull([working_capital, total_assets, retained_earnings, ebit, market_cap, total_liabilities, revenue])):
-                    A = working_capital / total_assets if total_assets else 0
-                    B = retained_earnings / total_assets if total_assets else 0
-                    C = ebit / total_assets if total_assets else 0
-                    D = market_cap / total_liabilities if total_liabilities else 0
-                    E = revenue / total_assets if total_assets else 0
-                    z_score = 1.2 * A + 1.4 * B + 3.3 * C + 0.6 * D + 1.0 * E
-                    self.qratios.loc[date, "Altman Z-Score"] = z_score
-                else:
-                    self.qratios.loc[date, "Altman Z-Score"] = np.nan
-
-            except Exception as e:
-                self.errors.append(f"Could not calculate quarterly ratios for {self.ticker} on {date}. Reason: {e}")
-
-        
-        growth_cols = [ "Revenue", "Net Income", "Gross Profit", "Operating Income", "Operating Cash Flow", "Free Cash Flow", "EBIT" ]
-
-        for col in growth_cols:
-            if col in self.qfinancials.columns:
-                self.qfinancials[f"{col} QoQ"] = self.qfinancials[col].pct_change(fill_method=None).round(4) * 100
-
-        self.format_ratios(type='q')
-        self.qfinancials.dropna(inplace = True)
-        self.qratios.dropna(inplace = True)
 
+        # Altman Z falls back to today's market cap where a quarter has none, so it is part of the inputs as well
+        market_cap = self.info.get("marketCap")
+        closes = period_closes(self.ypricehistory, self.q_dates)
+        key = self.derived_key(QUARTERLY_ENDPOINTS, market_cap, closes)
+        entry = self.memoized("derived_quarterly")
+        if entry is not None and entry["fingerprint"] == key:
+            self.restore(entry)
+            return
+        first_error = len(self.errors)
+
+        statements = (self.q_income_stmt, self.q_balance_sheet, self.q_cashflow_stmt)
+        rolled = self.rolled_dates(entry, statements, self.q_dates, closes)
+        if rolled is None or not self.append_quarters(entry, statements, *rolled, closes, market_cap):
+            qfinancials, qratios, self.qmultiples = self.quarterly_rows(statements, self.q_dates, closes)
+            self.qfinancials = qfinancials.dropna()
+            self.qratios = qratios.dropna()
+        self.remember("derived_quarterly", key, ("qfinancials", "qratios", "qmultiples"), self.errors[first_error:],
+                      statements, self.q_dates, closes, market_cap=market_cap)
+
+    def period_market_caps(self, aligned, closes):
+        # Each quarter's close times its shares, today's market cap where either is missing
+        caps = market_caps(aligned, closes)
+        fallback = self.info.get("marketCap")
+        return np.where(np.isnan(caps), np.nan if fallback is None else fallback, caps)
+
+    def quarterly_rows(self, statements, dates, closes):
+        """qfinancials, qratios and qmultiples of `dates` before incomplete rows are dropped; the first row has no QoQ growth"""
+        # Aligning the three statements once and computing every column in one pass
+        aligned = self.get_safe_columns(statements, dates)
+        financials = build_financials(aligned, dates, QUARTERLY_FINANCIAL_COLUMNS)
+        ratios = build_ratios(financials)
+        ratios["Altman Z-Score"] = altman_z(financials, self.period_market_caps(aligned, closes))
+
+        keys = period_keys(dates, quarterly=True)
+        qfinancials = add_growth(pd.concat([keys, financials], axis=1), "QoQ")
+        qmultiples = pd.concat([keys, valuation_multiples(aligned, financials, closes)], axis=1)
+        return qfinancials, round_ratios(pd.concat([keys, ratios], axis=1)), qmultiples
+
+    def append_quarters(self, entry, statements, kept, new_dates, closes, market_cap):
+        """Trims the memoized frames to `kept` and extends them with the rows of `new_dates`, returning False when they can't be reused"""
+        old_cap = entry.get("market_cap")
+        # Quarters without a market cap of their own drop out when there is no fallback either
+        if pd.isna(old_cap) != pd.isna(market_cap):
+            return False
+        # The first kept quarter lost the one before it, and with it its QoQ growth, so it drops out like the first one always does
+        qfinancials = trim_rows(entry["frames"]["qfinancials"], kept[1:])
+        qratios = trim_rows(entry["frames"]["qratios"], kept)
+        qmultiples = trim_rows(entry["frames"]["qmultiples"], kept)
+
+        if len(new_dates):
+            # The quarter before the first new one is recalculated too, for the new rows' QoQ growth
+            first = self.q_dates.get_loc(new_dates[0]) - 1
+            new_financials, new_ratios, new_multiples = self.quarterly_rows(statements, self.q_dates[first:], closes[first:])
+            qfinancials = pd.concat([qfinancials, new_financials.iloc[1:].dropna()])
+            qmultiples = pd.concat([qmultiples, new_multiples.iloc[1:]])
+            new_ratios = new_ratios.iloc[1:].dropna()
+        else:
+            # Same statements, so the same missing columns to warn about
+            self.errors.extend(entry["errors"])
+            new_ratios = qratios.iloc[:0]
+
+        if not pd.isna(market_cap) and market_cap != old_cap:
+            # Only Altman Z of the quarters falling back to today's market cap moves with it
+            aligned, _ = align_statements(*statements, qratios.index)
+            financials = build_financials(aligned, qratios.index, QUARTERLY_FINANCIAL_COLUMNS)
+            caps = self.period_market_caps(aligned, closes[self.q_dates.get_indexer(qratios.index)])
+            qratios = qratios.copy()
+            qratios["Altman Z-Score"] = np.round(altman_z(financials, caps), RATIO_DECIMALS["Altman Z-Score"])
+
+        self.qfinancials = qfinancials
+        self.qratios = pd.concat([qratios, new_ratios]) if len(new_ratios) else qratios
+        self.qmultiples = qmultiples
+        return True
+
+    @timed_method
     def calculate_yearly_ratios(self):
         if self.y_dates.empty:
             self.errors.append(f"No yearly data available for {self.ticker} to calculate ratios.")
             return
-        
-        for date in self.y_dates:
-            try:
-                # Pull values from yearly financials
-                revenue = self.y_income_stmt.loc[date, "Total Revenue"]
-                net_income = self.y_income_stmt.loc[date, "Net Income"]
-                gross_profit = self.y_income_stmt.loc[date, "Gross Profit"]
-                operating_income = self.y_income_stmt.loc[date, "Operating Income"]
-                total_assets = self.y_balance_sheet.loc[date, "Total Assets"]
-                total_liabilities = self.y_balance_sheet.loc[date, "Total Liabilities Net Minority Interest"]
-                equity = self.y_balance_sheet.loc[date, "Stockholders Equity"]
-                current_assets = self.y_balance_sheet.loc[date, "Current Assets"]
-                current_liabilities = self.y_balance_sheet.loc[date, "Current Liabilities"]
-
-                inventory = self.get_safe_value(self.y_balance_sheet, "Inventory", date)
-                cash = self.get_safe_value(self.y_balance_sheet, "Cash And Cash Equivalents", date)
-                receivables = self.get_safe_value(self.y_balance_sheet, "Accounts Receivable", date)
-                invested_capital = self.get_safe_value(self.y_balance_sheet, "Invested Capital", date)
-                retained_earnings = self.get_safe_value(self.y_balance_sheet, "Retained Earnings", date)
-                ebit = self.get_safe_value(self.y_income_stmt, "EBIT", date)
-                if pd.isna(ebit):
-                    ebit = self.get_safe_value(self.y_income_stmt, "Operating Income", date)
-
-                op_cash_flow = self.y_cashflow_stmt.loc[date, "Operating Cash Flow"]
-                capex = self.get_safe_value(self.y_cashflow_stmt, "Capital Expenditure", date, default=0)
-                free_cash_flow = op_cash_flow - capex
-                working_capital = current_assets - current_liabilities
-
-                # Store financials
-                self.yfinancials.loc[date, "Revenue"] = revenue
-                self.yfinancials.loc[date, "Net Income"] = net_income
-                self.yfinancials.loc[date, "Gross Profit"] = gross_profit
-                self.yfinancials.loc[date, "Operating Income"] = operating_income
-                self.yfinancials.loc[date, "Total Assets"] = total_assets
-                self.yfinancials.loc[date, "Total Liabilities"] = total_liabilities
-                self.yfinancials.loc[date, "Equity"] = equity
-                self.yfinancials.loc[date, "Current Assets"] = current_assets
-                self.yfinancials.loc[date, "Current Liabilities"] = current_liabilities
-                self.yfinancials.loc[date, "Inventory"] = inventory
-                self.yfinancials.loc[date, "Cash"] = cash
-                self.yfinancials.loc[date, "Receivables"] = receivables
-                self.yfinancials.loc[date, "Invested Capital"] = invested_capital
-                self.yfinancials.loc[date, "Retained Earnings"] = retained_earnings
-                self.yfinancials.loc[date, "EBIT"] = ebit
-                self.yfinancials.loc[date, "Operating Cash Flow"] = op_cash_flow
-                self.yfinancials.loc[date, "Capital Expenditure"] = capex
-                self.yfinancials.loc[date, "Free Cash Flow"] = free_cash_flow
-                self.yfinancials.loc[date, "Working Capital"] = working_capital
-
-                # Ratios
-                self.yratios.loc[date, "Net Profit Margin"] = (net_income / revenue) * 100 if revenue else np.nan
-                self.yratios.loc[date, "Gross Margin"] = (gross_profit / revenue) * 100 if revenue else np.nan
-                self.yratios.loc[date, "Operating Margin"] = (operating_income / revenue) * 100 if revenue else np.nan
-                self.yratios.loc[date, "ROA"] =( net_income / total_assets) * 100 if total_assets else np.nan
-                self.yratios.loc[date, "ROE"] = (net_income / equity) * 100 if equity else np.nan
-                self.yratios.loc[date, "Current Ratio"] = current_assets / current_liabilities if current_liabilities else np.nan
-                self.yratios.loc[date, "Quick Ratio"] = (current_assets - inventory) / current_liabilities if current_liabilities else np.nan
-                self.yratios.loc[date, "Cash Ratio"] = cash / current_liabilities if current_liabilities else np.nan
-                self.yratios.loc[date, "Debt-to-Equity"] = total_liabilities / equity if equity else np.nan
-                self.yratios.loc[date, "Debt Ratio"] = total_liabilities / total_assets if total_assets else np.nan
-                self.yratios.loc[date, "Cash Flow Margin"] = (op_cash_flow / revenue) * 100 if revenue else np.nan
-                self.yratios.loc[date, "Inventory Turnover"] = revenue / inventory if inventory else np.nan
-                self.yratios.loc[date, "Asset Turnover"] = revenue / total_assets if total_assets else np.nan
-                self.yratios.loc[date, "Receivables Turnover"] = revenue / receivables if receivables else np.nan
-                self.yratios.loc[date, "CapEx Intensity"] = (capex / revenue) * 100 if revenue else np.nan
-                self.yratios.loc[date, "ROCE"] = (operating_income / invested_capital) * 100 if invested_capital else np.nan
-                self.yratios.loc[date, "FCF Conversion"] = (free_cash_flow / net_income) * 100 if net_income else np.nan
-                self.yratios.loc[date, 'Financial Leverage'] = total_assets / equity if equity else np.nan
 
+        closes = period_closes(self.ypricehistory, self.y_dates)
+        key = self.derived_key(YEARLY_ENDPOINTS, closes)
+        entry = self.memoized("derived_yearly")
+        if entry is not None and entry["fingerprint"] == key:
+            self.restore(entry)
+            return
+        first_error = len(self.errors)
+
+        statements = (self.y_income_stmt, self.y_balance_sheet, self.y_cashflow_stmt)
+        rolled = self.rolled_dates(entry, statements, self.y_dates, closes)
+        if rolled is not None:
+            kept, new_dates = rolled
+            # The first kept year lost the one before it, and with it its YoY growth
+            self.yfinancials = trim_rows(entry["frames"]["yfinancials"], kept, growth_suffix="YoY")
+            self.yratios = trim_rows(entry["frames"]["yratios"], kept)
+            self.ymultiples = trim_rows(entry["frames"]["ymultiples"], kept)
+            if len(new_dates):
+                # The year before the first new one is recalculated too, for the new rows' YoY growth
+                first = self.y_dates.get_loc(new_dates[0]) - 1
+                new_financials, new_ratios, new_multiples = self.yearly_rows(statements, self.y_dates[first:], closes[first:])
+                self.yfinancials = pd.concat([self.yfinancials, new_financials.iloc[1:]])
+                self.yratios = pd.concat([self.yratios, new_ratios.iloc[1:]])
+                self.ymultiples = pd.concat([self.ymultiples, new_multiples.iloc[1:]])
+            else:
+                # Same statements, so the same missing columns to warn about
+                self.errors.extend(entry["errors"])
+        else:
+            try:
+                self.yfinancials, self.yratios, self.ymultiples = self.yearly_rows(statements, self.y_dates, closes)
             except Exception as e:
-                self.errors.append(f"Could not calculate yearly ratios for {self.ticker} on {date}. Reason: {e}")
-
-        growth_cols = [ "Revenue", "Net Income", "Gross Profit", "Operating Income", "Operating Cash Flow", "Free Cash Flow", "EBIT" ]
-
-        for col in growth_cols:
-            if col in self.yfinancials.columns:
-                self.yfinancials[f"{col} YoY"] = self.yfinancials[col].pct_change(fill_method=None).round(4) * 100
+                for date in self.y_dates:
+                    self.errors.append(f"Could not calculate yearly ratios for {self.ticker} on {date}. Reason: {e}")
+                return
+        self.remember("derived_yearly", key, ("yfinancials", "yratios", "ymultiples"), self.errors[first_error:],
+                      statements, self.y_dates, closes)
+
+    def yearly_rows(self, statements, dates, closes):
+        """yfinancials, yratios and ymultiples of `dates`; the first row has no YoY growth"""
+        aligned = self.get_safe_columns(statements, dates, required=YEARLY_REQUIRED_COLUMNS)
+        financials = build_financials(aligned, dates, YEARLY_FINANCIAL_COLUMNS)
+        ratios = build_ratios(financials)
+
+        keys = period_keys(dates, quarterly=False)
+        yfinancials = add_growth(pd.concat([keys, financials], axis=1), "YoY")
+        ymultiples = pd.concat([keys, valuation_multiples(aligned, financials, closes)], axis=1)
+        return yfinancials, round_ratios(pd.concat([keys, ratios], axis=1)), ymultiples
+
+    @timed_method
+    def calculate_ttm_ratios(self):
+        """Trailing-twelve-month financials, ratios and multiples, comparable with the yearly ones at every quarter"""
+        if self.q_dates.empty:
+            return
 
-        self.format_ratios(type='y')
+        market_cap = self.info.get("marketCap")
+        closes = period_closes(self.ypricehistory, self.q_dates)
+        key = self.derived_key(QUARTERLY_ENDPOINTS, market_cap, closes)
+        if self.reuse("derived_ttm", key):
+            return
 
+        # Missing rows were already warned about by the quarterly ratios
+        statements = (self.q_income_stmt, self.q_balance_sheet, self.q_cashflow_stmt)
+        aligned, _ = align_statements(*statements, self.q_dates)
+        complete = ttm_windows(self.q_dates)
+        financials = ttm_financials(build_financials(aligned, self.q_dates, QUARTERLY_FINANCIAL_COLUMNS), complete)
+        ratios = build_ratios(financials)
+        ratios["Altman Z-Score"] = altman_z(financials, self.period_market_caps(aligned, closes))
+
+        keys = period_keys(self.q_dates, quarterly=True)
+        self.tfinancials = pd.concat([keys, financials], axis=1).dropna()
+        self.tratios = round_ratios(pd.concat([keys, ratios], axis=1)).dropna()
+        self.tmultiples = pd.concat([keys, valuation_multiples(aligned, financials, closes)], axis=1)[complete]
+        self.remember("derived_ttm", key, ("tfinancials", "tratios", "tmultiples"))
+
+    @timed_method
     def one_time_ratios(self):
         if self.latest_quarter:
             date = self.latest_quarter
@@ -276,98 +504,42 @@ class stock():
             self.ev_fcf = ev / free_cash_flow if ev and free_cash_flow else np.nan
             self.fcf_yield = (free_cash_flow / market_cap) * 100 if free_cash_flow and market_cap else np.nan
 
+    def one_time_metrics(self):
+        """The one-time valuation metrics as numbers, NaN where they could not be calculated"""
+        values = {"Market Cap": self.info.get("marketCap")}
+        values.update({label: getattr(self, attr, None) for label, attr in ONE_TIME_METRICS.items()})
+        # "N/A" strings and missing values become NaN so the metrics stay numeric
+        return {label: float(value) if isinstance(value, (int, float, np.number)) else np.nan for label, value in values.items()}
+
+    def dcf_inputs(self):
+        """Latest yearly revenue, net debt and shares plus the growth and margin seeds a DCF starts from, None without them"""
+        if "Revenue" not in self.yfinancials.columns or self.yfinancials.empty:
+            return None
+        assumptions = seed_assumptions(self.yfinancials)
+        latest = self.ymultiples.iloc[-1] if "Enterprise Value" in self.ymultiples.columns and len(self.ymultiples) else {}
+
+        # Debt less cash at the last year end, or as Yahoo reports it today
+        net_debt = latest.get("Enterprise Value", np.nan) - latest.get("Market Cap", np.nan)
+        if pd.isna(net_debt):
+            net_debt = (self.info.get("totalDebt") or 0) - (self.info.get("totalCash") or 0)
+        shares = self.info.get("sharesOutstanding")
+        revenue = self.yfinancials["Revenue"].iloc[-1]
+        if not shares or pd.isna(revenue) or pd.isna(assumptions["margin_mean"]):
+            return None
+        return {"revenue": float(revenue), "assumptions": assumptions, "net_debt": float(net_debt), "shares": float(shares)}
+
+    @timed_method
     def piotroski_f_score_yearly(self):
-        piotroski_columns = [
-            "Net Income",
-            "ROA",
-            "Operating Cash Flow",
-            "Operating Cash Flow > Net Income",
-            "Lower Debt/Equity vs Last Year",
-            "Higher Current Ratio vs Last Year",
-            "No New Shares Issued",  # will be filled later
-            "Higher Gross Margin vs Last Year",
-            "Higher Asset Turnover vs Last Year"
-        ]
-
-        rows = []
-
-        def gv(col, year):
-            return self.yfinancials.loc[year, col] if col in self.yfinancials.columns else np.nan
-
-        def gr(col, year):
-            return self.yratios.loc[year, col] if col in self.yratios.columns else np.nan
-        
-        for i in range(1, len(self.y_dates)):
-            year = self.y_dates[i]
-            prev_year = self.y_dates[i-1]
-
-            row = {col: 0 for col in piotroski_columns}
-            row["Year"] = year.year
-
-            if gv("Net Income", year) > 0:
-                row["Net Income"] = 1
-
-            if gr("ROA", year) > 0:
-                row["ROA"] = 1
-
-            if gv("Operating Cash Flow", year) > 0:
-                row["Operating Cash Flow"] = 1
-
-            if gv("Operating Cash Flow", year) > gv("Net Income", year):
-                row["Operating Cash Flow > Net Income"] = 1
-
-            debt_curr = gr("Debt Ratio", year)
-            debt_prev = gr("Debt Ratio", prev_year)
-            if pd.notna(debt_curr) and pd.notna(debt_prev) and debt_curr < debt_prev:
-                row["Lower Debt/Equity vs Last Year"] = 1
-
-            curr_curr = gr("Current Ratio", year)
-            curr_prev = gr("Current Ratio", prev_year)
-            if pd.notna(curr_curr) and pd.notna(curr_prev) and curr_curr > curr_prev:
-                row["Higher Current Ratio vs Last Year"] = 1
-
-            gm_curr = gr("Gross Margin", year)
-            gm_prev = gr("Gross Margin", prev_year)
-            if pd.notna(gm_curr) and pd.notna(gm_prev) and gm_curr > gm_prev:
-                row["Higher Gross Margin vs Last Year"] = 1
-
-            at_curr = gr("Asset Turnover", year)
-            at_prev = gr("Asset Turnover", prev_year)
-            if pd.notna(at_curr) and pd.notna(at_prev) and at_curr > at_prev:
-                row["Higher Asset Turnover vs Last Year"] = 1
-
-            rows.append(row)
-
-        self.f_score_y = pd.DataFrame(rows)
-        self.f_score_y.set_index("Year", inplace=True)
-        self.f_score_y = self.f_score_y[piotroski_columns]
-        self.f_score_y['F Score'] = self.f_score_y.sum(axis = 1)
+        # The scores only depend on the yearly frames, which only depend on the yearly statements
+        key = self.derived_key(YEARLY_ENDPOINTS)
+        if self.reuse("derived_piotroski", key):
+            return
+        # Every criterion for every year in one pass over the yearly columns
+        self.f_score_y = piotroski_scores(self.yfinancials, self.yratios)
+        self.remember("derived_piotroski", key, ("f_score_y",))
 
     def format_ratios(self, type):
-        percent_columns = [
-            "Net Profit Margin", "Gross Margin", "Operating Margin",
-            "ROA", "ROE", "Cash Flow Margin", "CapEx Intensity",
-            "FCF Conversion"
-        ]
-
-        ratio_columns = [
-            "Current Ratio", "Quick Ratio", "Cash Ratio",
-            "Debt-to-Equity", "Debt Ratio", "Inventory Turnover",
-            "Asset Turnover", "Receivables Turnover",
-            "ROCE", "Altman Z-Score", "PEG Ratio", "Price-to-Book"
-        ]
-
         if type == 'q':
-            df = self.qratios
+            self.qratios = round_ratios(self.qratios)
         elif type == 'y':
-            df = self.yratios
-        else:
-            return
-
-        for col in percent_columns:
-            if col in df.columns:
-                df[col] = df[col].round(5)
-
-        for col in ratio_columns:
-            if col in df.columns:
-                df[col] = df[col].round(4)
\ No newline at end of file
+            self.yratios = round_ratios(self.yratios)